@@ -6,14 +6,32 @@
 
 import os
 import json
+import argparse
+import bisect
+import collections
+import concurrent.futures
+import hashlib
+import ntpath
 import re
+import heapq
 import logging
+import multiprocessing
+import pickle
+import pathlib
+import shutil
 import sqlite3
+import uuid
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from PIL import Image, ImageTk
 import ctypes
 
+# Optional: a faster JSON parser/serializer. Plain json is used without it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ---------------------------------------
 # Logging
 # ---------------------------------------
@@ -39,6 +57,10 @@ def setup_logging(log_dir):
 TABLE_NAME = "DATA"
 ID_COLUMN = "_id"
 JSON_COLUMN = "FILE"
+SNAPSHOT_FILENAME = "ghub_profile_editor.snapshot"
+SNAPSHOT_VERSION = 5
+# Largest size icon previews are shown at; bigger images are scaled down to fit
+ICON_PREVIEW_SIZE = (256, 256)
 
 # ---------------------------------------
 # Path Definitions
@@ -61,6 +83,12 @@ def get_db_path():
     logging.debug(f"DB path resolved to: {db_path}")
     return db_path
 
+def get_snapshot_path(log_dir):
+    """
+    Returns the path to the warm-start snapshot, kept next to the log file.
+    """
+    return os.path.join(log_dir, SNAPSHOT_FILENAME)
+
 def get_icon_cache_path():
     """
     Returns the path to the icon_cache folder.
@@ -70,82 +98,1985 @@ def get_icon_cache_path():
     logging.debug(f"Icon cache path resolved to: {icon_cache_path}")
     return icon_cache_path
 
+# ---------------------------------------
+# DB Connection
+# ---------------------------------------
+# Rows that can hold profiles are picked inside SQLite, so the rest never cross into Python.
+# The byte probe (instr on the raw BLOB) is all the filtering done there: asking JSON1
+# to validate the rows would parse every document in SQLite before Python parses it again.
+APPS_KEY_PROBE = b'"applications"'
+SELECT_PROFILE_ROWS_SQL = (
+    f"SELECT {ID_COLUMN}, {JSON_COLUMN} FROM {TABLE_NAME} "
+    f"WHERE instr({JSON_COLUMN}, ?) > 0"
+)
+# Names-first loading: only the profile list of each row, extracted by SQLite.
+# json_type and json_extract share one parse of the document; rows whose list isn't
+# an array are skipped in Python. A malformed document makes the query fail.
+SELECT_PROFILE_LISTS_SQL = (
+    f"SELECT {ID_COLUMN}, json_type(CAST({JSON_COLUMN} AS TEXT), '$.applications.applications'), "
+    f"json_extract(CAST({JSON_COLUMN} AS TEXT), '$.applications.applications') "
+    f"FROM {TABLE_NAME} WHERE instr({JSON_COLUMN}, ?) > 0"
+)
+SELECT_ROW_SQL = f"SELECT {JSON_COLUMN} FROM {TABLE_NAME} WHERE {ID_COLUMN} = ?"
+UPDATE_ROW_SQL = f"UPDATE {TABLE_NAME} SET {JSON_COLUMN} = ? WHERE {ID_COLUMN} = ?"
+
+class SettingsDB:
+    """
+    A single sqlite3 connection to settings.db, opened lazily and kept for the
+    whole session. The SQL above is always passed as the same strings, so sqlite3's
+    statement cache hands back already-prepared statements on every call.
+    If settings.db is replaced on disk (new file identity), the connection is reopened.
+
+    parse_cache maps row id -> CachedRow so reloads only re-parse rows whose bytes
+    changed, and saves can write a row back the way it was formatted. The cached
+    documents are the same objects handed out to callers, so an edited document
+    should be saved (which refreshes its entry).
+
+    With read_only=True the file is opened through a "mode=ro&immutable=1" URI:
+    no locks, no journal checks, so browsing never contends with a running G HUB.
+    If G HUB has committed changes still sitting in the -wal file (which immutable
+    mode would not see), the DB is instead copied into memory with the backup API.
+    """
+    def __init__(self, db_path, read_only=False):
+        self.db_path = db_path
+        self.read_only = read_only
+        self.conn = None
+        self.file_id = None
+        self.parse_cache = {}
+        self.base_data_version = None
+        self.reconnected = False
+        self.has_json1 = None
+        # Rows loaded names-first whose documents haven't been parsed (not in
+        # parse_cache): row id -> the profile list read for it
+        self.unparsed_rows = {}
+
+    def _current_file_id(self):
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino)
+
+    def connection(self):
+        """
+        Returns the open connection, (re)connecting if needed.
+        """
+        file_id = self._current_file_id()
+        if self.conn is not None and file_id != self.file_id:
+            logging.info(f"DB file was replaced on disk, reconnecting: {self.db_path}")
+            self.close()
+            self.reconnected = True
+        if self.conn is None:
+            self.conn = self._open_read_only() if self.read_only else sqlite3.connect(self.db_path)
+            self.file_id = file_id
+            self.base_data_version = self.data_version()
+            logging.debug(f"Opened DB connection: {self.db_path}")
+        return self.conn
+
+    def _open_read_only(self):
+        uri = pathlib.Path(os.path.abspath(self.db_path)).as_uri()
+        try:
+            wal_size = os.path.getsize(self.db_path + "-wal")
+        except OSError:
+            wal_size = 0
+        if not wal_size:
+            return sqlite3.connect(f"{uri}?mode=ro&immutable=1", uri=True)
+
+        logging.info("settings.db has pending WAL content, browsing an in-memory copy.")
+        source = sqlite3.connect(f"{uri}?mode=ro", uri=True)
+        try:
+            copy = sqlite3.connect(":memory:")
+            source.backup(copy)
+        finally:
+            source.close()
+        return copy
+
+    def execute(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    def read_row(self, row_id):
+        """
+        Returns the stored BLOB of one row as bytes, or None if the row is gone.
+        """
+        found = self.execute(SELECT_ROW_SQL, (row_id,)).fetchone()
+        if found is None or found[0] is None:
+            return None
+        blob = found[0]
+        return blob.encode("utf-8") if isinstance(blob, str) else blob
+
+    def json1_available(self):
+        if self.has_json1 is None:
+            try:
+                self.connection().execute("SELECT json_type('{}')").fetchone()
+                self.has_json1 = True
+            except sqlite3.OperationalError:
+                self.has_json1 = False
+                logging.info("SQLite has no JSON1 support, profile lists are loaded with their documents.")
+        return self.has_json1
+
+    def select_profile_rows(self):
+        """
+        Returns a cursor over the (_id, FILE) rows that can hold profiles.
+        """
+        return self.execute(SELECT_PROFILE_ROWS_SQL, (APPS_KEY_PROBE,))
+
+    def select_profile_lists(self):
+        """
+        Returns a cursor over (_id, JSON type, profile list JSON text) for every
+        row the byte probe matches, or None without JSON1. The rest of each
+        document stays in SQLite.
+        """
+        if not self.json1_available():
+            return None
+        return self.execute(SELECT_PROFILE_LISTS_SQL, (APPS_KEY_PROBE,))
+
+    def data_version(self):
+        """
+        SQLite's PRAGMA data_version for this connection. It changes only when
+        another connection commits, never for this connection's own writes.
+        """
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def unchanged_by_others(self):
+        """
+        True if nobody else has written settings.db since this connection opened,
+        i.e. parse_cache plus our own saves still describe the file exactly.
+        """
+        if self.conn is None or self.reconnected:
+            return False
+        try:
+            return self.data_version() == self.base_data_version
+        except Exception as e:
+            logging.warning(f"Could not read data_version: {e}")
+            return False
+
+    def update_rows(self, rows):
+        """
+        Writes several (row_id, blob) pairs in one transaction: all or nothing, one commit.
+        """
+        if self.read_only:
+            raise sqlite3.OperationalError("settings.db is open read-only (browse mode)")
+        conn = self.connection()
+        with conn:
+            conn.executemany(UPDATE_ROW_SQL, ((blob, row_id) for row_id, blob in rows))
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception as e:
+                logging.warning(f"Failed to close DB connection: {e}")
+            self.conn = None
+            self.file_id = None
+
+# What the loader keeps per row: digest of the stored BLOB, the parsed document,
+# its JsonFormat and the ApplicationsLayout of its profile list (None if unknown)
+CachedRow = collections.namedtuple("CachedRow", ["digest", "document", "fmt", "layout"])
+
+def blob_digest(blob):
+    """
+    Short content hash used to tell whether a row's BLOB changed.
+    """
+    return hashlib.blake2b(blob, digest_size=16).digest()
+
+_db_handles = {}
+
+def get_db(db_path, read_only=None):
+    """
+    Returns the shared SettingsDB handle for db_path, creating it on first use.
+    Every caller working on the same settings.db goes through this one handle.
+    read_only=None keeps whatever mode the handle already has (read-write if new);
+    True/False switches an existing handle to that mode.
+    """
+    key = os.path.normcase(os.path.abspath(db_path))
+    db = _db_handles.get(key)
+    if db is None:
+        db = SettingsDB(db_path, read_only=bool(read_only))
+        _db_handles[key] = db
+    elif read_only is not None and db.read_only != read_only:
+        db.close()
+        db.read_only = read_only
+    return db
+
+def close_all_dbs():
+    """
+    Closes every handle returned by get_db().
+    """
+    for db in _db_handles.values():
+        db.close()
+    _db_handles.clear()
+
+# ---------------------------------------
+# JSON Backend
+# ---------------------------------------
+class StdlibJsonCodec:
+    """
+    Parses and serializes settings.db documents with the standard json module.
+    dumps() takes a JsonFormat and returns UTF-8 bytes.
+    """
+    name = "json"
+
+    def loads(self, blob):
+        return json.loads(blob.decode("utf-8"))
+
+    def dumps(self, obj, fmt):
+        return json.dumps(
+            obj, indent=fmt.indent, separators=fmt.separators, ensure_ascii=fmt.ensure_ascii
+        ).encode("utf-8")
+
+class OrjsonCodec(StdlibJsonCodec):
+    """
+    orjson-backed codec. It only handles the layouts orjson can lay out exactly
+    like json.dumps (compact, or indent=2 with ": "; both unescaped UTF-8) and
+    hands everything else, including input orjson rejects such as integers over
+    64 bits, to the stdlib codec. The JSON values written are the same either way,
+    but floats in exponent range are spelled differently (1e-05 vs 0.00001), and
+    NaN/Infinity, which are not JSON and which G HUB never writes, become null.
+    """
+    name = "orjson"
+
+    def loads(self, blob):
+        try:
+            return orjson.loads(blob)
+        except orjson.JSONDecodeError:
+            return super().loads(blob)
+
+    def dumps(self, obj, fmt):
+        if fmt.ensure_ascii:
+            option = None
+        elif fmt.indent is None and fmt.separators == (",", ":"):
+            option = 0
+        elif fmt.indent == 2 and fmt.separators == (",", ": "):
+            option = orjson.OPT_INDENT_2
+        else:
+            option = None
+        if option is None:
+            return super().dumps(obj, fmt)
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            return super().dumps(obj, fmt)
+
+def get_json_codec(name=None):
+    """
+    Returns the codec called name ("json" or "orjson"), or the fastest one
+    available when name is None.
+    """
+    if name is None:
+        name = "orjson" if orjson is not None else "json"
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("orjson is not installed")
+        return OrjsonCodec()
+    if name == "json":
+        return StdlibJsonCodec()
+    raise ValueError(f"Unknown JSON codec: {name}")
+
+# Used by every load and save below
+json_codec = get_json_codec()
+
+# ---------------------------------------
+# JSON Formatting
+# ---------------------------------------
+# How a document was laid out on disk, in json.dumps terms
+JsonFormat = collections.namedtuple(
+    "JsonFormat", ["indent", "separators", "ensure_ascii", "trailing_newline"]
+)
+# G HUB itself writes compact UTF-8
+COMPACT_JSON_FORMAT = JsonFormat(None, (",", ":"), False, False)
+# What this editor wrote before it preserved formatting; used for rows we never read
+DEFAULT_JSON_FORMAT = JsonFormat(2, (",", ": "), True, False)
+
+_FIRST_KEY_RE = re.compile(rb'\A\s*\{(\s*)"(?:[^"\\]|\\.)*"([ \t]*):([ \t]*)')
+_FIRST_COMMA_RE = re.compile(rb'"(?:[^"\\]|\\.)*"|,([ \t]*)')
+# A \uXXXX escape of a non-ASCII character (not preceded by an escaped backslash)
+_NON_ASCII_ESCAPE_RE = re.compile(rb'(?<!\\)(?:\\\\)*\\u(?!00[0-7])[0-9a-fA-F]{4}')
+
+def uses_ascii_escapes(blob):
+    """
+    True if blob was written with ensure_ascii: it is pure ASCII and spells at
+    least one non-ASCII character as a \\u escape. A pure-ASCII blob without such
+    escapes comes out the same either way, so it counts as unescaped UTF-8
+    (the layout orjson can write).
+    """
+    return blob.isascii() and b"\\u" in blob and _NON_ASCII_ESCAPE_RE.search(blob) is not None
+
+def detect_json_format(blob):
+    """
+    Works out the indentation, separators and escaping of a serialized JSON object
+    from its first few KB, so encode_json can write it back the same way.
+    Key order needs no detection: json.loads keeps it.
+    """
+    head = blob[:4096]
+    m = _FIRST_KEY_RE.match(head)
+    if m is None:
+        return COMPACT_JSON_FORMAT
+    key_sep = m.group(2).decode() + ":" + m.group(3).decode()
+
+    lead = m.group(1)
+    if b"\n" in lead:
+        indent = lead.rsplit(b"\n", 1)[1].decode()
+        indent = len(indent) if indent.strip(" ") == "" else indent
+        item_sep = ","
+    else:
+        indent = None
+        item_sep = ","
+        for token in _FIRST_COMMA_RE.finditer(head, m.end()):
+            if token.group(1) is not None:
+                item_sep += token.group(1).decode()
+                break
+    return JsonFormat(
+        indent,
+        (item_sep, key_sep),
+        uses_ascii_escapes(blob),
+        blob.endswith(b"\n")
+    )
+
+def encode_json(obj, fmt):
+    """
+    Serializes obj to UTF-8 bytes in the given JsonFormat.
+    """
+    blob = json_codec.dumps(obj, fmt)
+    if fmt.trailing_newline:
+        blob += b"\n"
+    return blob
+
+# ---------------------------------------
+# Applications Patching
+# ---------------------------------------
+# Byte offsets of the "applications" -> "applications" array inside a stored BLOB:
+# the array's [start, end) and one (start, end) pair per entry, in list order.
+ApplicationsLayout = collections.namedtuple(
+    "ApplicationsLayout", ["array_start", "array_end", "entry_spans"]
+)
+# The profile list is three levels down: document -> "applications" -> "applications" -> entry
+APPS_ARRAY_LEVEL = 2
+
+def encode_nested(obj, fmt, level):
+    """
+    Serializes obj the way json.dumps(..., fmt) lays it out when nested `level`
+    containers deep, so the bytes can be spliced straight into a stored document.
+    """
+    blob = json_codec.dumps(obj, fmt)
+    if fmt.indent is not None and level:
+        unit = " " * fmt.indent if isinstance(fmt.indent, int) else fmt.indent
+        blob = blob.replace(b"\n", b"\n" + unit.encode("utf-8") * level)
+    return blob
+
+def encode_array_with_spans(items, fmt, level):
+    """
+    Serializes a list like encode_nested does, also returning each element's
+    (start, end) offsets relative to the start of the array.
+    """
+    if not items:
+        return b"[]", []
+    item_sep = fmt.separators[0].encode("utf-8")
+    if fmt.indent is None:
+        opening, separator, closing = b"[", item_sep, b"]"
+    else:
+        unit = (" " * fmt.indent if isinstance(fmt.indent, int) else fmt.indent).encode("utf-8")
+        opening = b"[\n" + unit * (level + 1)
+        separator = item_sep + b"\n" + unit * (level + 1)
+        closing = b"\n" + unit * level + b"]"
+
+    parts = [opening]
+    spans = []
+    pos = len(opening)
+    for i, item in enumerate(items):
+        if i:
+            parts.append(separator)
+            pos += len(separator)
+        encoded = encode_nested(item, fmt, level + 1)
+        parts.append(encoded)
+        spans.append((pos, pos + len(encoded)))
+        pos += len(encoded)
+    parts.append(closing)
+    return b"".join(parts), spans
+
+def get_apps_list(parsed_data):
+    """
+    Returns the document's "applications" -> "applications" list, or None.
+    """
+    if not isinstance(parsed_data, dict):
+        return None
+    apps_section = parsed_data.get("applications")
+    if not isinstance(apps_section, dict):
+        return None
+    apps_list = apps_section.get("applications")
+    return apps_list if isinstance(apps_list, list) else None
+
+def find_applications_layout(blob, parsed_data, fmt):
+    """
+    Locates the profile list inside the stored BLOB by serializing just that list
+    in the row's format and searching for it. Costs one pass over the list, not the
+    document. Returns None if the list can't be found exactly once (e.g. the row
+    uses a layout encode_json doesn't reproduce), which disables patching for the row.
+    """
+    apps_list = get_apps_list(parsed_data)
+    if apps_list is None:
+        return None
+    try:
+        array_bytes, spans = encode_array_with_spans(apps_list, fmt, APPS_ARRAY_LEVEL)
+        key_bytes = json.dumps("applications").encode("utf-8") + fmt.separators[1].encode("utf-8")
+    except Exception as e:
+        logging.debug(f"Could not encode profile list for patching: {e}")
+        return None
+    needle = key_bytes + array_bytes
+    found = blob.find(needle)
+    if found < 0 or blob.find(needle, found + 1) >= 0:
+        return None
+    start = found + len(key_bytes)
+    return ApplicationsLayout(
+        start,
+        start + len(array_bytes),
+        [(start + s, start + e) for (s, e) in spans]
+    )
+
+def splice_applications(old_blob, layout, parsed_data, fmt):
+    """
+    Builds the new BLOB for a document whose only edits are in its profile list by
+    splicing freshly serialized entries into old_blob. With the same number of
+    entries only the entries that changed are replaced; after an add/delete the
+    array is replaced as a whole. Returns (new_blob, new_layout), or None if the
+    document no longer has a profile list.
+    """
+    apps_list = get_apps_list(parsed_data)
+    if apps_list is None:
+        return None
+
+    if len(apps_list) != len(layout.entry_spans):
+        array_bytes, spans = encode_array_with_spans(apps_list, fmt, APPS_ARRAY_LEVEL)
+        start = layout.array_start
+        new_blob = old_blob[:start] + array_bytes + old_blob[layout.array_end:]
+        return new_blob, ApplicationsLayout(
+            start,
+            start + len(array_bytes),
+            [(start + s, start + e) for (s, e) in spans]
+        )
+
+    parts = []
+    new_spans = []
+    copied_up_to = 0
+    shift = 0
+    for prof, (start, end) in zip(apps_list, layout.entry_spans):
+        encoded = encode_nested(prof, fmt, APPS_ARRAY_LEVEL + 1)
+        if encoded != old_blob[start:end]:
+            parts.append(old_blob[copied_up_to:start])
+            parts.append(encoded)
+            copied_up_to = end
+            new_spans.append((start + shift, start + shift + len(encoded)))
+            shift += len(encoded) - (end - start)
+        else:
+            new_spans.append((start + shift, end + shift))
+    if not parts:
+        return old_blob, layout
+    parts.append(old_blob[copied_up_to:])
+    return b"".join(parts), ApplicationsLayout(
+        layout.array_start,
+        layout.array_end + shift,
+        new_spans
+    )
+
 # ---------------------------------------
 # DB Helpers
 # ---------------------------------------
-def load_profiles_from_db(db_path):
+class ProfileRow:
     """
-    Reads the 'DATA' table from G-Hub's settings.db, decodes the BLOB column as JSON,
-    returns a list of dicts: { db_row_id, entire_json, profile }.
-    Each 'profile' is one entry in the "applications" array.
+    One DB row that holds profiles: its id and the whole parsed JSON document.
+    Shared by all ProfileRecords of that row.
+
+    Rows loaded names-first (load_profile_list_from_db) start with document=None
+    and entries set to their parsed profile list; load_row_document fills in the
+    document before the row is edited.
+    """
+    __slots__ = ("row_id", "document", "entries")
+
+    def __init__(self, row_id, document, entries=None):
+        self.row_id = row_id
+        self.document = document
+        self.entries = entries
+
+class ProfileRecord:
+    """
+    One profile: its entry in the row's "applications" array plus the row it lives in.
+    The full document is only reachable through .row. sort_key is the cached
+    profile_sort_key a ProfileStore filed the record under (None outside a store).
+    """
+    __slots__ = ("row", "profile", "sort_key")
+
+    def __init__(self, row, profile):
+        self.row = row
+        self.profile = profile
+        self.sort_key = None
+
+def profile_sort_key(item):
+    """
+    Sort key for the profile list: case-insensitive (casefolded) profile name.
+    """
+    return item.profile.get("name", "").casefold()
+
+def iter_row_profiles(row_id, parsed_data):
+    """
+    Yields one ProfileRecord per entry of the row's "applications" -> "applications" array.
+    """
+    row = ProfileRow(row_id, parsed_data)
+    for prof in get_apps_list(parsed_data) or []:
+        yield ProfileRecord(row, prof)
+
+def parse_row(db, row_id, data_blob):
+    """
+    Parses one row's BLOB, through the parse cache: only rows whose bytes changed
+    since they were last seen are decoded again. Returns (document, reparsed);
+    document is None if the row isn't valid JSON.
+    """
+    digest = blob_digest(data_blob)
+    cached = db.parse_cache.get(row_id)
+    if cached is not None and cached.digest == digest:
+        return cached.document, False
+    try:
+        parsed_data = json_codec.loads(data_blob)
+    except Exception as e:
+        logging.warning(f"Failed to parse JSON row {row_id}: {e}")
+        parsed_data = None
+    fmt = detect_json_format(data_blob)
+    layout = find_applications_layout(data_blob, parsed_data, fmt)
+    db.parse_cache[row_id] = CachedRow(digest, parsed_data, fmt, layout)
+    db.unparsed_rows.pop(row_id, None)
+    return parsed_data, True
+
+def iter_profiles_from_db(db_path):
+    """
+    Streams the 'DATA' table row by row and yields ProfileRecords as soon as
+    each row is parsed (unsorted). Each BLOB is dropped once it has
+    been handled, so only one row's bytes are held in memory at a time.
+    Rows without an "applications" section are filtered out by SQLite and never read.
     """
     logging.debug(f"Loading profiles from DB: {db_path}")
+    db = get_db(db_path)
+    seen_rows = set()
+    reparsed = 0
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT {ID_COLUMN}, {JSON_COLUMN} FROM {TABLE_NAME}")
-        rows = cursor.fetchall()
-        conn.close()
+        cursor = db.select_profile_rows()
+        for (row_id, data_blob) in cursor:
+            if not data_blob:
+                continue
+            seen_rows.add(row_id)
+            if isinstance(data_blob, str):
+                data_blob = data_blob.encode("utf-8")
+
+            # Only decode + parse rows whose bytes changed since the last load
+            parsed_data, reparsed_row = parse_row(db, row_id, data_blob)
+            reparsed += reparsed_row
+            del data_blob
+
+            if isinstance(parsed_data, dict):
+                yield from iter_row_profiles(row_id, parsed_data)
     except Exception as e:
         logging.error(f"Failed to connect or query the DB: {e}")
-        return []
+        return
 
-    all_profiles = []
-    for (row_id, data_blob) in rows:
-        if not data_blob:
-            continue
+    # Full pass done: rows that disappeared (or no longer hold profiles) drop out of the cache
+    for row_id in set(db.parse_cache) - seen_rows:
+        del db.parse_cache[row_id]
+    db.unparsed_rows.clear()
+    logging.debug(f"Parsed {reparsed} of {len(seen_rows)} rows, the rest came from the parse cache.")
+
+def load_profiles_from_db(db_path):
+    """
+    Reads the 'DATA' table from G-Hub's settings.db, decodes the BLOB column as JSON,
+    returns a list of ProfileRecords sorted by name.
+    Each record's 'profile' is one entry in the "applications" array.
+    """
+    # Sort them by profile "name" alphabetically
+    all_profiles = sorted(iter_profiles_from_db(db_path), key=profile_sort_key)
+    logging.info(f"Loaded {len(all_profiles)} profiles across all rows.")
+    return all_profiles
+
+def encode_row(db, row_id, entire_json):
+    """
+    Serializes an edited document for writing back to row_id, keeping the
+    formatting the row was loaded with. Returns (blob, CachedRow) for the new
+    contents, or None if the document encodes to the bytes already stored.
+    Raises if the document can't be serialized.
+
+    When the row's profile list offsets are known and the stored BLOB is still the
+    one they were taken from, only the changed "applications" entries are spliced in
+    (see splice_applications). Otherwise the whole document is serialized.
+    Only the profile list is patched: code that edits anything else in entire_json
+    must clear the row's layout first (cached._replace(layout=None)).
+    """
+    cached = db.parse_cache.get(row_id)
+    fmt = cached.fmt if cached is not None else DEFAULT_JSON_FORMAT
+    new_blob = None
+    layout = None
+
+    if cached is not None and cached.layout is not None:
         try:
-            json_str = data_blob.decode("utf-8")
-            parsed_data = json.loads(json_str)
+            old_blob = db.read_row(row_id)
         except Exception as e:
-            logging.warning(f"Failed to parse JSON row {row_id}: {e}")
-            continue
+            logging.warning(f"Could not re-read row {row_id} for patching: {e}")
+            old_blob = None
+        if old_blob is not None and blob_digest(old_blob) == cached.digest:
+            patched = splice_applications(old_blob, cached.layout, entire_json, fmt)
+            if patched is not None:
+                new_blob, layout = patched
+        else:
+            logging.debug(f"Row {row_id} changed since load, offsets are stale. Writing full document.")
 
-        apps_section = parsed_data.get("applications")
-        if isinstance(apps_section, dict):
-            apps_list = apps_section.get("applications", [])
-            if isinstance(apps_list, list):
-                for prof in apps_list:
-                    all_profiles.append({
-                        "db_row_id": row_id,
-                        "entire_json": parsed_data,
-                        "profile": prof
-                    })
+    if new_blob is None:
+        new_blob = encode_json(entire_json, fmt)
+        layout = find_applications_layout(new_blob, entire_json, fmt)
 
-    # Sort them by profile "name" alphabetically
-    all_profiles.sort(key=lambda p: p["profile"].get("name", "").lower())
-    logging.info(f"Loaded {len(all_profiles)} profiles across all rows.")
+    digest = blob_digest(new_blob)
+    if cached is not None and cached.digest == digest:
+        logging.debug(f"Row {row_id} unchanged, nothing to write.")
+        return None
+    return new_blob, CachedRow(digest, entire_json, fmt, layout)
+
+def load_profile_list_from_db(db_path):
+    """
+    Names-first load for a fast first paint: SQLite extracts just each row's
+    "applications" -> "applications" list, and only those lists are parsed in
+    Python. The records are complete (name, path, icon, id) but their rows have
+    no document yet; call load_row_document before editing one.
+    Without JSON1, or if SQLite can't parse a row, this is the same as
+    load_profiles_from_db.
+    Returns a list of ProfileRecords sorted by name.
+    """
+    db = get_db(db_path)
+    all_profiles = []
+    try:
+        cursor = db.select_profile_lists()
+        if cursor is None:
+            return load_profiles_from_db(db_path)
+        for (row_id, apps_type, apps_text) in cursor:
+            if apps_type != "array":
+                continue
+            try:
+                apps_list = json_codec.loads(apps_text.encode("utf-8"))
+            except Exception as e:
+                logging.warning(f"Failed to parse profile list of row {row_id}: {e}")
+                continue
+            all_profiles.extend(iter_row_entries(db, row_id, apps_list))
+    except sqlite3.OperationalError as e:
+        # Typically "malformed JSON" in some row: let the full load sort the rows out
+        logging.warning(f"SQLite could not extract the profile lists ({e}), loading whole documents.")
+        db.unparsed_rows.clear()
+        return load_profiles_from_db(db_path)
+    except Exception as e:
+        logging.error(f"Failed to connect or query the DB: {e}")
+        return []
+    all_profiles.sort(key=profile_sort_key)
+    logging.info(f"Loaded {len(all_profiles)} profiles across all rows (documents not parsed yet).")
     return all_profiles
 
+def iter_row_entries(db, row_id, apps_list):
+    """
+    Yields ProfileRecords for a row known only by its profile list (no document
+    yet), and remembers the row as unparsed.
+    """
+    row = ProfileRow(row_id, None, apps_list)
+    db.unparsed_rows[row_id] = apps_list
+    for prof in apps_list:
+        yield ProfileRecord(row, prof)
+
+def load_row_document(db_path, store, row):
+    """
+    Parses the whole document of a row loaded names-first and re-points the row's
+    records in store at the entries inside it, so edits land in the document that
+    gets saved. Returns the document, or None if the row can't be read or no
+    longer holds the profiles it was listed with.
+    """
+    if row.document is not None:
+        return row.document
+    db = get_db(db_path)
+    try:
+        data_blob = db.read_row(row.row_id)
+    except Exception as e:
+        logging.error(f"Failed to read row {row.row_id}: {e}")
+        return None
+    parsed_data = parse_row(db, row.row_id, data_blob)[0] if data_blob else None
+    apps_list = get_apps_list(parsed_data)
+    if apps_list is None or apps_list != row.entries:
+        logging.error(f"Row {row.row_id} changed in the DB since the profile list was loaded.")
+        return None
+
+    positions = {id(prof): idx for idx, prof in enumerate(row.entries)}
+    for record in store.row_profiles(row.row_id):
+        record.profile = apps_list[positions[id(record.profile)]]
+    row.document = parsed_data
+    row.entries = None
+    return parsed_data
+
 def save_profile_to_db(db_path, row_id, entire_json):
     """
     Writes the updated JSON (as BLOB) back to the DB, row matching row_id.
+    The row keeps the formatting it was loaded with; a document that serializes to
+    the bytes already stored is not written at all (see encode_row).
+    """
+    save_rows_to_db(db_path, [(row_id, entire_json)])
+
+def save_rows_to_db(db_path, rows):
+    """
+    Writes several edited documents, given as (row_id, entire_json) pairs, in a
+    single transaction. Rows whose bytes would not change are skipped.
+    Returns True if every row is now in sync with the DB, False if anything failed
+    (then nothing was written).
     """
+    db = get_db(db_path)
+    writes = []
+    for row_id, entire_json in rows:
+        try:
+            encoded = encode_row(db, row_id, entire_json)
+        except Exception as e:
+            logging.error(f"Could not encode updated JSON for row {row_id}: {e}")
+            return False
+        if encoded is not None:
+            writes.append((row_id, encoded))
+    if not writes:
+        return True
+
     try:
-        new_json_str = json.dumps(entire_json, indent=2)
-        new_blob = new_json_str.encode("utf-8")
+        db.update_rows([(row_id, blob) for row_id, (blob, _cached) in writes])
     except Exception as e:
-        logging.error(f"Could not encode updated JSON: {e}")
+        logging.error(f"DB update failed: {e}")
+        return False
+    for row_id, (blob, cached) in writes:
+        db.parse_cache[row_id] = cached
+        logging.debug(f"Row {row_id} updated in DB ({len(blob)} bytes).")
+    return True
+
+# ---------------------------------------
+# Profile Store
+# ---------------------------------------
+def normalize_app_path(path):
+    """
+    Canonical form of a (Windows) application path for lookups: case and
+    separators don't matter. Empty paths stay empty.
+    """
+    if not path:
+        return ""
+    return ntpath.normcase(ntpath.normpath(path.strip()))
+
+_SEARCH_TOKEN_RE = re.compile(r"\w+")
+
+def search_words(text):
+    """
+    Splits a name, path or query into casefolded words for searching.
+    """
+    return _SEARCH_TOKEN_RE.findall(text.casefold())
+
+def profile_search_tokens(item):
+    """
+    The words a profile can be found by: those of its name and of its applicationPath.
+    """
+    prof = item.profile
+    return frozenset(search_words(prof.get("name", "")) + search_words(prof.get("applicationPath", "")))
+
+class PrefixIndex:
+    """
+    Trie over the words of every profile's name and applicationPath.
+    A query matches a profile when each query word is a prefix of one of its words
+    ("cal du" finds "Call of Duty"). Profiles are added/removed one at a time, so
+    the trie never needs rebuilding.
+
+    Nodes are dicts of child characters; the None key holds the profiles whose
+    word ends at that node, as a dict of id(record) -> record so removing one is
+    O(1) even for words most profiles share ("c", "games").
+    """
+    def __init__(self):
+        self.root = {}
+        self.tokens = {}  # id(record) -> the words it was indexed under
+
+    def add(self, item):
+        tokens = profile_search_tokens(item)
+        self.tokens[id(item)] = tokens
+        for token in tokens:
+            node = self.root
+            for ch in token:
+                node = node.setdefault(ch, {})
+            node.setdefault(None, {})[id(item)] = item
+
+    def remove(self, item):
+        for token in self.tokens.pop(id(item), ()):
+            path = [self.root]
+            for ch in token:
+                path.append(path[-1].get(ch))
+                if path[-1] is None:
+                    break
+            else:
+                node = path[-1]
+                ending = node.get(None, {})
+                ending.pop(id(item), None)
+                if not ending:
+                    node.pop(None, None)
+                # Prune branches that no longer lead to any profile
+                for depth in range(len(token), 0, -1):
+                    if path[depth]:
+                        break
+                    del path[depth - 1][token[depth - 1]]
+
+    def _prefix_matches(self, word):
+        node = self.root
+        for ch in word:
+            node = node.get(ch)
+            if node is None:
+                return {}
+        found = {}
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, value in node.items():
+                if key is None:
+                    found.update(value)
+                else:
+                    stack.append(value)
+        return found
+
+    def matches(self, item, words):
+        """
+        True if every query word is a prefix of one of the profile's words.
+        """
+        tokens = self.tokens.get(id(item), ())
+        return all(any(token.startswith(word) for token in tokens) for word in words)
+
+    def search(self, query, within=None):
+        """
+        Profiles matching query. Pass the previous result as within when query
+        only extends the previous query (typing more): the answer is then a
+        subset of it, so only those profiles are checked and the trie isn't walked.
+        """
+        words = search_words(query)
+        if not words:
+            return list(within) if within is not None else []
+        if within is not None:
+            return [item for item in within if self.matches(item, words)]
+
+        # Walk the trie for the longest word (smallest subtree), check the rest directly
+        words.sort(key=len, reverse=True)
+        candidates = self._prefix_matches(words[0]).values()
+        return [item for item in candidates if self.matches(item, words[1:])]
+
+def word_trigrams(word):
+    """
+    Trigrams of one word, padded pg_trgm-style: "cal" -> "  c", " ca", "cal", "al ".
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def name_trigrams(words):
+    """
+    Trigrams of every word of a name (as split by search_words).
+    """
+    grams = set()
+    for word in words:
+        grams.update(word_trigrams(word))
+    return grams
+
+def name_acronyms(words):
+    """
+    Every run of two or more consecutive word initials: "Call of Duty: Modern
+    Warfare" -> "co", "cod", "codm", ..., "mw". A query word equal to one of
+    them matches by initials.
+    """
+    initials = "".join(word[0] for word in words)
+    return {initials[start:end] for start in range(len(initials)) for end in range(start + 2, len(initials) + 1)}
+
+class TrigramIndex:
+    """
+    Fuzzy name lookup for the quick-open dialog. Each trigram maps to the ids of the
+    profiles whose name contains it, and each run of word initials ("cod", "mw") to
+    the ids of the profiles it abbreviates. Kept up to date by ProfileStore like the
+    other indexes.
+
+    Candidates are the profiles sharing enough of the query's trigrams, plus those
+    whose initials spell a query word. They are ranked per query word: a word
+    that starts one of the name's words or spells a run of its initials counts in
+    full, any other word by the share of its trigrams found in the name.
+
+    Postings are sets of id(record) so removing a profile doesn't scan the (long)
+    lists behind common trigrams like "  c".
+    """
+    # Share of the query's trigrams a name needs to be a candidate by trigrams alone
+    MIN_SIMILARITY = 0.3
+    # What a query word that is only similar (not a word start or initials) can score
+    SIMILAR_WORD_WEIGHT = 0.5
+
+    def __init__(self):
+        self.postings = collections.defaultdict(set)
+        self.acronyms = collections.defaultdict(set)
+        self.entries = {}  # id(record) -> (record, trigrams, words, acronyms)
+
+    def add(self, item):
+        words = search_words(item.profile.get("name", ""))
+        grams = name_trigrams(words)
+        acronyms = name_acronyms(words)
+        self.entries[id(item)] = (item, grams, words, acronyms)
+        for gram in grams:
+            self.postings[gram].add(id(item))
+        for acronym in acronyms:
+            self.acronyms[acronym].add(id(item))
+
+    def remove(self, item):
+        _item, grams, _words, acronyms = self.entries.pop(id(item), (None, (), (), ()))
+        for index, keys in ((self.postings, grams), (self.acronyms, acronyms)):
+            for key in keys:
+                posting = index[key]
+                posting.discard(id(item))
+                if not posting:
+                    del index[key]
+
+    def _word_score(self, word, word_grams, entry):
+        _item, grams, words, acronyms = entry
+        if word in acronyms or any(name_word.startswith(word) for name_word in words):
+            return 1.0
+        return self.SIMILAR_WORD_WEIGHT * len(word_grams & grams) / len(word_grams)
+
+    def search(self, query, limit=20):
+        """
+        Up to limit profiles, best match first: highest per-word score, then most
+        shared trigrams, then the closest overall (Jaccard), then list order.
+        """
+        query_words = search_words(query)
+        if not query_words:
+            return []
+        query_word_grams = [word_trigrams(word) for word in query_words]
+        query_grams = set().union(*query_word_grams)
+
+        counts = collections.Counter()
+        for gram in query_grams:
+            posting = self.postings.get(gram)
+            if posting:
+                counts.update(posting)
+        initials_hits = collections.Counter()
+        for word in query_words:
+            initials_hits.update(self.acronyms.get(word, ()))
+        needed = max(1, round(len(query_grams) * self.MIN_SIMILARITY))
+        candidates = {key for key, count in counts.items() if count >= needed}
+        candidates.update(initials_hits)
+
+        # Bound the exact ranking to the most promising few, the key below is the slow part
+        candidates = heapq.nlargest(
+            limit * 4, candidates, key=lambda key: (initials_hits[key], counts[key])
+        )
+        query_size = len(query_grams)
+
+        def rank(key):
+            entry = self.entries[key]
+            score = sum(
+                self._word_score(word, word_grams, entry)
+                for word, word_grams in zip(query_words, query_word_grams)
+            )
+            common = counts[key]
+            return (-score, -common, -common / (query_size + len(entry[1]) - common), entry[0].sort_key)
+
+        return [self.entries[key][0] for key in sorted(candidates, key=rank)[:limit]]
+
+class ProfileStore:
+    """
+    All loaded profiles, kept sorted by profile_sort_key, with indexes by
+    applicationId, DB row id and normalized applicationPath. Each index bucket is
+    a dict of id(record) -> record (in insertion order), so adding or removing a
+    profile is O(1) even when a bucket holds nearly every profile, as the one for
+    G HUB's single row or for the empty path does.
+
+    Index by position like a list (store[i] is the i-th profile shown in the list).
+    Profiles must change through the store (add / remove / update) so the sorted
+    order and the indexes stay in step; posterPath and other unindexed fields can
+    be edited in place.
+
+    The sort keys are computed once per add and kept in self.keys, parallel to
+    self.items, so adds, removes and renames are a bisect plus one list
+    insert/pop; nothing is ever re-sorted after the initial load.
+    """
+    def __init__(self, profiles=()):
+        keyed = []
+        for item in profiles:
+            item.sort_key = profile_sort_key(item)
+            keyed.append(item)
+        keyed.sort(key=lambda item: item.sort_key)
+        self.items = keyed
+        self.keys = [item.sort_key for item in keyed]
+        self.by_app_id = collections.defaultdict(dict)
+        self.by_row = collections.defaultdict(dict)
+        self.by_path = collections.defaultdict(dict)
+        self.prefix_index = PrefixIndex()
+        self.trigram_index = TrigramIndex()
+        for item in self.items:
+            self._index(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, idx):
+        return self.items[idx]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    # -- indexes --
+    def _index_keys(self, item):
+        prof = item.profile
+        return (
+            (self.by_app_id, prof.get("applicationId")),
+            (self.by_row, item.row.row_id),
+            (self.by_path, normalize_app_path(prof.get("applicationPath", ""))),
+        )
+
+    def _index(self, item):
+        for index, key in self._index_keys(item):
+            index[key][id(item)] = item
+        self.prefix_index.add(item)
+        self.trigram_index.add(item)
+
+    def _unindex(self, item):
+        for index, key in self._index_keys(item):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(id(item), None)
+                if not bucket:
+                    del index[key]
+        self.prefix_index.remove(item)
+        self.trigram_index.remove(item)
+
+    def find_by_app_id(self, app_id):
+        """
+        Profiles with this applicationId (normally at most one).
+        """
+        return list(self.by_app_id.get(app_id, {}).values())
+
+    def new_app_id(self, taken=()):
+        """
+        A random (UUID4) applicationId that no profile in the store uses and that
+        isn't in taken (ids handed out but not added yet).
+        """
+        while True:
+            app_id = str(uuid.uuid4())
+            if app_id not in self.by_app_id and app_id not in taken:
+                return app_id
+
+    def find_by_path(self, path):
+        """
+        Profiles whose applicationPath matches path after normalization.
+        """
+        return list(self.by_path.get(normalize_app_path(path), {}).values())
+
+    def row_profiles(self, row_id):
+        """
+        All profiles stored in one DB row.
+        """
+        return list(self.by_row.get(row_id, {}).values())
+
+    def search(self, query, within=None):
+        """
+        Profiles whose name/path words start with the query's words, in list order.
+        See PrefixIndex.search for within.
+        """
+        found = self.prefix_index.search(query, within)
+        if within is None:
+            found.sort(key=lambda item: item.sort_key)
+        return found
+
+    def fuzzy_search(self, query, limit=20):
+        """
+        Best fuzzy matches for query by name, best first.
+        """
+        return self.trigram_index.search(query, limit)
+
+    # -- sorted order --
+    def index_of(self, item):
+        """
+        Position of item in the sorted order, found by bisecting on its cached key
+        (so it works even if the name was edited in place since it was added).
+        """
+        key = item.sort_key
+        idx = bisect.bisect_left(self.keys, key)
+        while idx < len(self.keys) and self.keys[idx] == key:
+            if self.items[idx] is item:
+                return idx
+            idx += 1
+        raise ValueError("profile is not in the store")
+
+    def names(self):
+        return [item.profile.get("name", "(Unnamed)") for item in self.items]
+
+    # -- changes --
+    def add(self, item):
+        """
+        Adds a profile at its sorted position and returns that position.
+        """
+        item.sort_key = profile_sort_key(item)
+        idx = bisect.bisect_right(self.keys, item.sort_key)
+        self.keys.insert(idx, item.sort_key)
+        self.items.insert(idx, item)
+        self._index(item)
+        return idx
+
+    def add_many(self, items):
+        """
+        Adds several profiles with one merge into the sorted list instead of one
+        list insert each: O(n + k log k) for k new profiles. A single profile
+        is bisected in (see add).
+        """
+        new_items = list(items)
+        if len(new_items) == 1:
+            self.add(new_items[0])
+            return
+        for item in new_items:
+            item.sort_key = profile_sort_key(item)
+            self._index(item)
+        new_items.sort(key=lambda item: item.sort_key)
+        # On equal keys merge takes existing items first, like add()'s bisect_right
+        self.items = list(heapq.merge(self.items, new_items, key=lambda item: item.sort_key))
+        self.keys = [item.sort_key for item in self.items]
+
+    def remove_at(self, idx):
+        """
+        Removes and returns the profile at position idx.
+        """
+        del self.keys[idx]
+        item = self.items.pop(idx)
+        self._unindex(item)
+        return item
+
+    def remove(self, item):
+        """
+        Removes a profile and returns the position it had.
+        """
+        idx = self.index_of(item)
+        self.remove_at(idx)
+        return idx
+
+    def remove_many(self, items):
+        """
+        Removes several profiles in one pass over the sorted list. A single
+        profile is removed by bisecting instead (see remove).
+        """
+        if len(items) == 1:
+            self.remove(items[0])
+            return
+        doomed = {id(item) for item in items}
+        for item in self.items:
+            if id(item) in doomed:
+                self._unindex(item)
+        kept = [item for item in self.items if id(item) not in doomed]
+        self.items = kept
+        self.keys = [item.sort_key for item in kept]
+
+    def __contains__(self, item):
+        try:
+            self.index_of(item)
+        except ValueError:
+            return False
+        return True
+
+    def update(self, item, changes, removed=()):
+        """
+        Applies a dict of profile field changes (e.g. name, applicationPath), drops
+        the fields named in removed, and moves the profile to its new sorted
+        position. Returns (old_idx, new_idx).
+        """
+        old_idx = self.remove(item)
+        item.profile.update(changes)
+        for key in removed:
+            item.profile.pop(key, None)
+        new_idx = self.add(item)
+        return old_idx, new_idx
+
+def add_new_profiles(store, row, count=1, name="New Entry"):
+    """
+    Appends count blank custom profiles to the row's "applications" array, each
+    with its own new applicationId, and adds them to store. The ids are checked
+    against the store's id index and against each other, so a batch is
+    collision-free in O(count). The row's document must be loaded.
+    Returns the new ProfileRecords, in array order.
+    """
+    entire_json = row.document
+    apps_section = entire_json.get("applications", {})
+    apps_list = apps_section.get("applications", [])
+
+    taken = set()
+    records = []
+    for _ in range(count):
+        app_id = store.new_app_id(taken)
+        taken.add(app_id)
+        new_profile = {
+            "applicationId": app_id,
+            "applicationPath": "",
+            "isCustom": True,
+            "name": name,
+            "posterPath": ""
+        }
+        apps_list.append(new_profile)
+        records.append(ProfileRecord(row, new_profile))
+    apps_section["applications"] = apps_list
+    entire_json["applications"] = apps_section
+
+    if count == 1:
+        store.add(records[0])
+    else:
+        store.add_many(records)
+    return records
+
+def remove_from_documents(records):
+    """
+    Removes the records' entries from their rows' "applications" arrays.
+    Entries are matched by identity, never by value, so two entries that happen
+    to be equal can't be mixed up, and there are no deep dict comparisons.
+    Each affected array is rebuilt once: deleting N profiles from a row of M
+    costs O(N + M). Returns the ProfileRows that changed.
+    """
+    doomed_by_row = {}
+    for record in records:
+        _row, doomed = doomed_by_row.setdefault(id(record.row), (record.row, set()))
+        doomed.add(id(record.profile))
+
+    changed_rows = []
+    for row, doomed in doomed_by_row.values():
+        apps_list = get_apps_list(row.document)
+        if apps_list is None:
+            continue
+        before = len(apps_list)
+        apps_list[:] = [prof for prof in apps_list if id(prof) not in doomed]
+        if len(apps_list) != before:
+            changed_rows.append(row)
+    return changed_rows
+
+# ---------------------------------------
+# Edit History
+# ---------------------------------------
+# Undo/redo entries are deltas: the fields that changed, or the entries added or
+# deleted plus where they sat in their array. Profiles are shared with the store
+# by reference, nothing is copied, so a long session costs a few small objects
+# per edit and undo never touches the DB.
+
+# Stands for a field the profile didn't have; undoing back to it removes the field
+MISSING_FIELD = object()
+
+class FieldEdit:
+    """
+    Field changes to one profile: only the keys that changed, old and new values.
+    """
+    __slots__ = ("item", "before", "after")
+
+    def __init__(self, item, before, after):
+        self.item = item
+        self.before = before
+        self.after = after
+
+    @classmethod
+    def between(cls, item, changes):
+        """
+        The edit that applying changes to item would make, None if nothing would change.
+        """
+        before = {}
+        after = {}
+        for key, value in changes.items():
+            old = item.profile.get(key, MISSING_FIELD)
+            if old != value:
+                before[key] = old
+                after[key] = value
+        return cls(item, before, after) if after else None
+
+    def items(self):
+        return [self.item]
+
+    def apply(self, store):
+        self._set(store, self.after)
+
+    def revert(self, store):
+        self._set(store, self.before)
+
+    def _set(self, store, values):
+        changes = {key: value for key, value in values.items() if value is not MISSING_FIELD}
+        removed = [key for key, value in values.items() if value is MISSING_FIELD]
+        store.update(self.item, changes, removed)
+
+class EntriesChange:
+    """
+    Profiles added to (added=True) or deleted from their rows' "applications"
+    arrays, each with its position in the array so undo puts it back in place.
+    """
+    __slots__ = ("entries", "added")
+
+    def __init__(self, entries, added):
+        self.entries = entries
+        self.added = added
+
+    @staticmethod
+    def _positions(records):
+        positions = {}
+        entries = []
+        for record in records:
+            if id(record.row) not in positions:
+                apps_list = get_apps_list(record.row.document) or []
+                positions[id(record.row)] = {id(prof): idx for idx, prof in enumerate(apps_list)}
+            entries.append((record, positions[id(record.row)][id(record.profile)]))
+        return entries
+
+    @classmethod
+    def inserted(cls, records):
+        """
+        Records already appended to their documents.
+        """
+        return cls(cls._positions(records), True)
+
+    @classmethod
+    def deleted(cls, records):
+        """
+        Records about to be deleted (call before they leave their documents).
+        """
+        return cls(cls._positions(records), False)
+
+    def items(self):
+        return [record for record, _position in self.entries]
+
+    def apply(self, store):
+        if self.added:
+            self._insert(store)
+        else:
+            self._remove(store)
+
+    def revert(self, store):
+        if self.added:
+            self._remove(store)
+        else:
+            self._insert(store)
+
+    def _insert(self, store):
+        # Lowest position first, so each lands where it was
+        for record, position in sorted(self.entries, key=lambda entry: entry[1]):
+            get_apps_list(record.row.document).insert(position, record.profile)
+        store.add_many(self.items())
+
+    def _remove(self, store):
+        records = self.items()
+        remove_from_documents(records)
+        store.remove_many(records)
+
+class IconFileEdit:
+    """
+    An icon file replaced on disk under the same path (Browse Icon or Import Icons
+    writing over the BMP a posterPath already names), so no field changes. The
+    images before and after are kept in the IconStore by digest; undo and redo
+    link the file back to one of them. before is None if there was no file.
+    """
+    __slots__ = ("records", "icon_store", "path", "before", "after")
+
+    def __init__(self, records, icon_store, path, before, after):
+        self.records = records
+        self.icon_store = icon_store
+        self.path = path
+        self.before = before
+        self.after = after
+
+    def items(self):
+        return list(self.records)
+
+    def apply(self, store):
+        self._restore(self.after)
+
+    def revert(self, store):
+        self._restore(self.before)
+
+    def _restore(self, digest):
+        try:
+            self.icon_store.restore(digest, self.path)
+        except OSError as e:
+            logging.error(f"Could not restore icon file {self.path}: {e}")
+
+class EditGroup:
+    """
+    Several edits made as one action (e.g. a bulk icon import), undone together.
+    """
+    __slots__ = ("edits",)
+
+    def __init__(self, edits):
+        self.edits = edits
+
+    def items(self):
+        return [item for edit in self.edits for item in edit.items()]
+
+    def apply(self, store):
+        for edit in self.edits:
+            edit.apply(store)
+
+    def revert(self, store):
+        for edit in reversed(self.edits):
+            edit.revert(store)
+
+class EditHistory:
+    """
+    Undo and redo stacks of FieldEdit / EntriesChange / IconFileEdit / EditGroup deltas. Only the last limit
+    edits are kept. undo() and redo() change the profiles in memory (through the
+    store) and return the change, or None if there was nothing to undo/redo;
+    writing the affected rows is left to the caller.
+    """
+    def __init__(self, limit=500):
+        self.undo_stack = collections.deque(maxlen=limit)
+        self.redo_stack = []
+
+    def record(self, change):
+        """
+        Records an edit that was just made. A new edit ends the redo chain.
+        """
+        if change is None:
+            return
+        self.undo_stack.append(change)
+        self.redo_stack.clear()
+
+    def undo(self, store):
+        if not self.undo_stack:
+            return None
+        change = self.undo_stack.pop()
+        change.revert(store)
+        self.redo_stack.append(change)
+        return change
+
+    def redo(self, store):
+        if not self.redo_stack:
+            return None
+        change = self.redo_stack.pop()
+        change.apply(store)
+        self.undo_stack.append(change)
+        return change
+
+class DirtyTracker:
+    """
+    What differs from settings.db: the rows that need writing (row id -> ProfileRow;
+    a row stays dirty after its edited profiles are deleted) and the profiles
+    edited or added since the last save, for the list indicator.
+    """
+    def __init__(self):
+        self.rows = {}
+        self.profiles = {}  # id(record) -> record
+
+    def __bool__(self):
+        return bool(self.rows)
+
+    def mark(self, record):
+        self.rows[record.row.row_id] = record.row
+        self.profiles[id(record)] = record
+
+    def forget(self, record):
+        """
+        Stops flagging a deleted profile; its row stays dirty.
+        """
+        self.rows[record.row.row_id] = record.row
+        self.profiles.pop(id(record), None)
+
+    def is_dirty(self, record):
+        return id(record) in self.profiles
+
+    def clear(self):
+        """
+        Everything was saved. Returns the profiles that were flagged.
+        """
+        flagged = list(self.profiles.values())
+        self.rows.clear()
+        self.profiles.clear()
+        return flagged
+
+# ---------------------------------------
+# Warm-start Snapshot
+# ---------------------------------------
+def db_fingerprint(db_path):
+    """
+    Identifies the exact on-disk state of settings.db without opening it in SQLite:
+    path, size and mtime, the header's file change counter (the persistent value
+    behind PRAGMA data_version) and the size/mtime of a pending -wal file.
+    Returns None if the file can't be read.
+    """
+    try:
+        st = os.stat(db_path)
+        with open(db_path, "rb") as f:
+            header = f.read(100)
+    except OSError as e:
+        logging.warning(f"Could not fingerprint DB file: {e}")
+        return None
+    change_counter = int.from_bytes(header[24:28], "big") if len(header) >= 28 else None
+    try:
+        wal_st = os.stat(db_path + "-wal")
+        wal = (wal_st.st_size, wal_st.st_mtime_ns)
+    except OSError:
+        wal = None
+    return (os.path.normcase(os.path.abspath(db_path)), st.st_size, st.st_mtime_ns, change_counter, wal)
+
+def read_snapshot_key(snapshot_path):
+    """
+    Returns the fingerprint the snapshot was written for, or None.
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            header = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Unreadable snapshot header {snapshot_path}: {e}")
+        return None
+    if header.get("version") != SNAPSHOT_VERSION:
+        return None
+    return header.get("key")
+
+def save_snapshot(snapshot_path, db_path):
+    """
+    Writes the profile list of every row holding profiles to the snapshot file,
+    keyed by the current fingerprint of settings.db: from the parse cache for rows
+    that were parsed, as read names-first for the rest. Only the lists are kept,
+    not the rest of the documents, so the file stays a small profile index.
+    Does nothing if the snapshot already matches.
+    """
+    key = db_fingerprint(db_path)
+    if key is None or read_snapshot_key(snapshot_path) == key:
         return
+    db = get_db(db_path)
+    # Plain dicts and lists, so the file doesn't depend on this module's import name
+    lists = dict(db.unparsed_rows)
+    for row_id, cached in db.parse_cache.items():
+        apps_list = get_apps_list(cached.document)
+        if apps_list is not None:
+            lists[row_id] = apps_list
+    tmp_path = snapshot_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            # Small header first so the key can be checked without loading the rows
+            pickle.dump({"version": SNAPSHOT_VERSION, "key": key}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(lists, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+        logging.debug(f"Snapshot written: {snapshot_path} ({len(lists)} rows)")
+    except Exception as e:
+        logging.warning(f"Failed to write snapshot {snapshot_path}: {e}")
 
+def load_profiles_from_snapshot(snapshot_path, db_path):
+    """
+    Same result as load_profile_list_from_db, read from the snapshot instead of
+    the DB: every row comes back names-first and is parsed when first edited.
+    Returns None if there is no snapshot or settings.db changed since it was written.
+    """
+    key = db_fingerprint(db_path)
+    if key is None or read_snapshot_key(snapshot_path) != key:
+        logging.debug("No matching snapshot, loading from DB.")
+        return None
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        sql = f"UPDATE {TABLE_NAME} SET {JSON_COLUMN} = ? WHERE {ID_COLUMN} = ?"
-        cursor.execute(sql, (new_blob, row_id))
-        conn.commit()
-        conn.close()
-        logging.debug(f"Row {row_id} updated in DB.")
+        with open(snapshot_path, "rb") as f:
+            pickle.load(f)
+            lists = pickle.load(f)
     except Exception as e:
-        logging.error(f"DB update failed: {e}")
+        logging.warning(f"Failed to read snapshot {snapshot_path}: {e}")
+        return None
+
+    all_profiles = []
+    db = get_db(db_path)
+    for row_id, apps_list in lists.items():
+        all_profiles.extend(iter_row_entries(db, row_id, apps_list))
+    all_profiles.sort(key=profile_sort_key)
+    logging.info(f"Loaded {len(all_profiles)} profiles from snapshot.")
+    return all_profiles
+
+def refresh_snapshot(snapshot_path, db_path):
+    """
+    Called on exit: closes the DB and rewrites the snapshot from the loaded rows,
+    so the next start is warm even after a cold load or our own saves.
+    Skipped if someone else wrote the DB meanwhile.
+    """
+    db = get_db(db_path)
+    if db.conn is None:
+        # DB never opened this session, the snapshot on disk is still valid
+        return
+    if db.read_only:
+        # Immutable/copied connections can't tell whether the file changed meanwhile
+        db.close()
+        return
+    if not db.unchanged_by_others():
+        logging.info("settings.db was changed by another process, not refreshing snapshot.")
+        db.close()
+        return
+    # Close first: the last connection checkpoints the WAL, which changes the fingerprint
+    db.close()
+    save_snapshot(snapshot_path, db_path)
+
+# ---------------------------------------
+# Icon Conversion
+# ---------------------------------------
+# One icon being converted in the background: the future, the profile it's for
+# and where the BMP goes once it is done
+IconJob = collections.namedtuple("IconJob", ["future", "item", "final_path"])
+
+# A bulk import: its process pool and, per conversion, (BMP path, the profiles that get it)
+IconImport = collections.namedtuple("IconImport", ["executor", "futures"])
+
+# How often the Tk loop checks on a running conversion
+ICON_POLL_MS = 50
+
+# Image files an import picks up; when a folder has several for one name, the first listed wins
+ICON_IMAGE_EXTENSIONS = (".bmp", ".png", ".ico", ".jpg", ".jpeg")
+
+def safe_icon_name(name):
+    """
+    File name (without extension) for a profile's icon: the profile name minus
+    anything but word characters, spaces and dashes, spaces turned into underscores.
+    """
+    app_name = name.strip() or "app_unknown"
+    return re.sub(r'[^\w\s-]', '', app_name).strip().replace(' ', '_') or "icon"
+
+def icon_target_path(prof, icon_cache_folder):
+    """
+    Where a profile's converted BMP goes: over its current icon file if it has
+    one (as .bmp), otherwise icon_cache/<safe name>.bmp.
+    """
+    existing_path = prof.get("posterPath", "").strip()
+    if existing_path:
+        base, _ext = os.path.splitext(existing_path)
+        return base + ".bmp"
+    return os.path.join(icon_cache_folder, safe_icon_name(prof.get("name", "")) + ".bmp")
+
+def match_icon_files(folder, records, icon_cache_folder):
+    """
+    Pairs the images in folder with profiles whose names give the same
+    safe_icon_name (ignoring case), e.g. "Call of Duty: MW.png" for the profile
+    "Call of Duty: MW". Returns {BMP target path: (source image, [records])};
+    profiles sharing a target are converted once.
+    """
+    images = {}
+    for entry in sorted(os.scandir(folder), key=lambda entry: entry.name):
+        stem, ext = os.path.splitext(entry.name)
+        ext = ext.lower()
+        if ext not in ICON_IMAGE_EXTENSIONS or not entry.is_file():
+            continue
+        key = safe_icon_name(stem).casefold()
+        current = images.get(key)
+        if current is None or ICON_IMAGE_EXTENSIONS.index(ext) < ICON_IMAGE_EXTENSIONS.index(current[1]):
+            images[key] = (entry.path, ext)
+
+    jobs = {}
+    for record in records:
+        image = images.get(safe_icon_name(record.profile.get("name", "")).casefold())
+        if image is None:
+            continue
+        target = icon_target_path(record.profile, icon_cache_folder)
+        jobs.setdefault(target, (image[0], []))[1].append(record)
+    return jobs
+
+# A converted icon not moved into place yet: its temporary file and a hash of its bytes
+ConvertedIcon = collections.namedtuple("ConvertedIcon", ["tmp_path", "digest"])
+
+def file_digest(path):
+    """
+    Hex content hash of a file, read in chunks.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def convert_icon_to_bmp(src_path, tmp_folder):
+    """
+    Converts an image file to BMP (the format LGHUB prefers) under a temporary
+    name in tmp_folder (the IconStore's folder, so storing it is a rename on the
+    same drive), and hashes the result. Returns a ConvertedIcon; the caller moves
+    it into place (IconStore.put), or deletes it if the conversion was cancelled
+    meanwhile, so a half-written or unwanted file never replaces an icon.
+    Runs on a worker, so it must not touch any widgets.
+    """
+    os.makedirs(tmp_folder, exist_ok=True)
+    tmp_path = os.path.join(tmp_folder, f"{uuid.uuid4().hex}.tmp")
+    with Image.open(src_path) as img:
+        img.save(tmp_path, "BMP")
+    return ConvertedIcon(tmp_path, file_digest(tmp_path))
+
+def discard_converted_icon(future):
+    """
+    Done-callback for conversions nobody is waiting for any more: removes the temporary BMP.
+    """
+    if future.cancelled() or future.exception() is not None:
+        return
+    tmp_path = future.result().tmp_path
+    try:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    except OSError as e:
+        logging.warning(f"Could not remove discarded icon {tmp_path}: {e}")
+
+class IconStore:
+    """
+    Content-addressed storage for the BMPs in icon_cache. Each distinct image is
+    kept once, as by-content/<hash>.bmp, and a profile's icon file is a hard link
+    to it: profiles keep their own file names, identical artwork takes disk space
+    once, and replacing one profile's icon through the store (os.replace swaps its
+    link, not the shared data) never changes another's. A tool that rewrites an
+    icon file in place does change every profile sharing it. Where no hard link
+    can be made (a filesystem without them, or a posterPath on another drive) the
+    icon is written as a plain file and nothing is kept in the store for it.
+    A stored image is removed as soon as the last icon file linking to it is
+    replaced, unless it was kept (keep) for undo: those are released together by
+    release_kept when the editor closes.
+
+    bytes_saved / files_shared count what sharing saved since the store was created.
+    """
+    def __init__(self, icon_cache_folder):
+        self.folder = os.path.join(icon_cache_folder, "by-content")
+        self.bytes_saved = 0
+        self.files_shared = 0
+        self.kept = set()  # digests undo/redo may link back
+
+    def object_path(self, digest):
+        return os.path.join(self.folder, digest + ".bmp")
+
+    def stored_digest(self, path):
+        """
+        The digest of the stored image path is a link to, None if it isn't one.
+        """
+        try:
+            if os.stat(path).st_nlink < 2:
+                return None
+            digest = file_digest(path)
+            return digest if os.path.samefile(self.object_path(digest), path) else None
+        except OSError:
+            return None
+
+    def release(self, digest):
+        """
+        Removes the stored image digest (if any) once no icon file links to it.
+        """
+        if digest is None or digest in self.kept:
+            return
+        object_path = self.object_path(digest)
+        try:
+            if os.stat(object_path).st_nlink == 1:
+                os.remove(object_path)
+                logging.debug(f"Removed unused stored icon {object_path}")
+        except OSError as e:
+            logging.debug(f"Could not release stored icon {object_path}: {e}")
+
+    def keep(self, path):
+        """
+        Makes sure the image at path is in the store (adding it as a link, or a copy
+        without hard links) and keeps it there until release_kept. Returns its
+        digest, None if there is no file at path.
+        """
+        if not os.path.isfile(path):
+            return None
+        digest = file_digest(path)
+        object_path = self.object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(self.folder, exist_ok=True)
+            try:
+                os.link(path, object_path)
+            except OSError:
+                shutil.copyfile(path, object_path)
+        self.kept.add(digest)
+        return digest
+
+    def restore(self, digest, target_path):
+        """
+        Points target_path back at a kept image, or removes it if digest is None.
+        """
+        if digest is None:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+            return
+        object_path = self.object_path(digest)
+        if self.link(object_path, target_path, shared=False):
+            return
+        target_tmp = f"{target_path}.{uuid.uuid4().hex}.tmp"
+        shutil.copyfile(object_path, target_tmp)
+        os.replace(target_tmp, target_path)
+
+    def release_kept(self):
+        """
+        Drops the images kept for undo that no icon file uses any more.
+        """
+        kept, self.kept = self.kept, set()
+        for digest in kept:
+            self.release(digest)
+
+    def put(self, converted, target_path):
+        """
+        Moves a converted icon (written into self.folder by convert_icon_to_bmp)
+        into the store and makes target_path a link to it.
+        Returns True if target_path now shares an image that was already stored.
+        """
+        object_path = self.object_path(converted.digest)
+        replaced = self.stored_digest(target_path)
+        shared = os.path.exists(object_path)
+        if shared:
+            os.remove(converted.tmp_path)
+        else:
+            os.replace(converted.tmp_path, object_path)
+        if self.link(object_path, target_path, shared):
+            if replaced != converted.digest:
+                self.release(replaced)
+            return shared
+
+        # No hard link possible: target_path gets a file of its own
+        target_tmp = f"{target_path}.{uuid.uuid4().hex}.tmp"
+        if shared:
+            shutil.copyfile(object_path, target_tmp)
+        else:
+            shutil.move(object_path, target_tmp)
+        os.replace(target_tmp, target_path)
+        self.release(replaced)
+        return False
+
+    def link(self, object_path, target_path, shared):
+        """
+        Makes target_path a hard link to object_path, counting the space saved if
+        the image was already stored (shared). Returns False, leaving target_path
+        as it was, if no hard link can be made there.
+        """
+        if os.path.exists(target_path) and os.path.samefile(object_path, target_path):
+            return True
+        link_tmp = f"{target_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(object_path, link_tmp)
+        except OSError as e:
+            logging.debug(f"No hard link for {target_path}: {e}")
+            return False
+        os.replace(link_tmp, target_path)
+        if shared:
+            self.bytes_saved += os.path.getsize(object_path)
+            self.files_shared += 1
+        return True
+
+    def dedupe_folder(self, folder):
+        """
+        Brings existing BMPs in folder (icon_cache) into the store: duplicates become
+        links to one stored copy. Stored images no file links to any more are
+        removed. Returns (files checked, bytes saved).
+        """
+        if not os.path.isdir(folder):
+            return 0, 0
+        os.makedirs(self.folder, exist_ok=True)
+        saved_before = self.bytes_saved
+        checked = 0
+        for entry in os.scandir(folder):
+            if not entry.is_file() or not entry.name.lower().endswith(".bmp"):
+                continue
+            checked += 1
+            try:
+                object_path = self.object_path(file_digest(entry.path))
+                if os.path.exists(object_path):
+                    if not self.link(object_path, entry.path, shared=True):
+                        logging.warning(f"Could not hard link {entry.path}, left as it was.")
+                else:
+                    # First copy of this image: it becomes the stored one, nothing is copied
+                    os.link(entry.path, object_path)
+            except OSError as e:
+                logging.warning(f"Could not deduplicate {entry.path}: {e}")
+        for entry in os.scandir(self.folder):
+            # os.stat, not entry.stat(): on Windows the latter always reports st_nlink 0
+            if entry.is_file() and entry.name.endswith(".bmp") and os.stat(entry.path).st_nlink == 1:
+                os.remove(entry.path)
+        return checked, self.bytes_saved - saved_before
+
+def format_size(size):
+    """
+    Byte count for reports, e.g. "12.3 MB".
+    """
+    if size < 1024:
+        return f"{size} bytes"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+# ---------------------------------------
+# Icon Previews
+# ---------------------------------------
+def open_preview_image(path, box=ICON_PREVIEW_SIZE):
+    """
+    Opens an image file scaled down to fit box, decoding as little as possible:
+    draft() lets JPEGs decode straight at 1/2, 1/4 or 1/8 scale, reduce() then
+    shrinks by a whole factor with a cheap box filter, and thumbnail() does the
+    final, proper resample. Images that already fit are returned as they are.
+    The file itself is never changed.
+    """
+    img = Image.open(path)
+    img.draft(None, box)
+    factor = min(img.width // box[0], img.height // box[1])
+    if factor >= 2:
+        try:
+            img = img.reduce(factor)
+        except ValueError:
+            # Palette and 1-bit images can't be reduced; thumbnail() below copes with them
+            pass
+    img.thumbnail(box)
+    return img
+
+class IconPreviewCache:
+    """
+    LRU cache of decoded icon previews, keyed by (path, mtime, size) so a file
+    rewritten on disk (e.g. by Browse Icon) is decoded again. The cap is on the
+    decoded pixels (4 bytes each) rather than the number of images, so a few
+    oversized icons can't hold on to much more memory than many small ones.
+    decode(path) turns a file into an image with width()/height() (a PhotoImage).
+    hits/misses count lookups.
+    """
+    def __init__(self, decode, max_bytes=32 * 1024 * 1024):
+        self.decode = decode
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()  # key -> (image, bytes), least recent first
+        self.key_by_path = {}  # path -> its current key, to drop outdated versions
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def file_key(path):
+        st = os.stat(path)
+        return (os.path.normcase(os.path.abspath(path)), st.st_mtime_ns, st.st_size)
+
+    def get(self, path):
+        """
+        The preview for path, decoded only on a miss. Raises OSError if the file
+        can't be stat'ed, and whatever decode raises.
+        """
+        key = self.file_key(path)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        image = self.decode(path)
+        old_key = self.key_by_path.pop(key[0], None)
+        if old_key is not None:
+            self._drop(old_key)
+        cost = image.width() * image.height() * 4
+        if cost <= self.max_bytes:
+            self.entries[key] = (image, cost)
+            self.key_by_path[key[0]] = key
+            self.total_bytes += cost
+            while self.total_bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+        return image
+
+    def _drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+            if self.key_by_path.get(key[0]) == key:
+                del self.key_by_path[key[0]]
+
+    def stats(self):
+        return (f"{self.hits} hits, {self.misses} misses, {len(self.entries)} cached "
+                f"({self.total_bytes / (1024 * 1024):.1f} of {self.max_bytes / (1024 * 1024):.1f} MB)")
 
 # ---------------------------------------
 # Main GUI
 # ---------------------------------------
 class GHubEditorApp:
-    def __init__(self, master, db_path, icon_cache_folder):
+    # List text color of profiles with unsaved edits, and of everything else
+    DIRTY_FG = "#ffcc66"
+    LIST_FG = "#ffffff"
+
+    def __init__(self, master, db_path, icon_cache_folder, profiles=None, read_only=False):
         self.master = master
-        master.title("G-Hub Profile Editor")
+        self.read_only = read_only
+        self.base_title = "G-Hub Profile Editor (read-only)" if read_only else "G-Hub Profile Editor"
+        master.title(self.base_title)
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Minimal dark theme
         self.apply_dark_theme(master)
@@ -154,16 +2085,30 @@ class GHubEditorApp:
         self.icon_cache_folder = icon_cache_folder
 
         # Create icon_cache folder if missing
-        if not os.path.isdir(self.icon_cache_folder):
+        if not self.read_only and not os.path.isdir(self.icon_cache_folder):
             try:
                 os.makedirs(self.icon_cache_folder, exist_ok=True)
                 logging.debug(f"Created icon_cache folder: {self.icon_cache_folder}")
             except Exception as e:
                 logging.warning(f"Failed to create icon_cache folder: {e}")
 
-        self.profiles = load_profiles_from_db(self.db_path)
+        if profiles is None:
+            profiles = load_profile_list_from_db(self.db_path)
+        self.profiles = ProfileStore(profiles)
+        # Profiles shown while a search is active (None = show all), and the query behind them
+        self.filtered = None
+        self.filter_query = ""
         self.selected_profile_index = None
         self.icon_tk = None
+        self.icon_previews = IconPreviewCache(self.decode_icon_preview)
+        # Icon conversions run here, off the Tk thread; one at a time
+        self.icon_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.icon_job = None
+        self.icon_import = None
+        self.icon_store = IconStore(self.icon_cache_folder)
+        # Edits made in memory but not written to the DB yet (see save_all)
+        self.dirty = DirtyTracker()
+        self.history = EditHistory()
 
         # --------- Left Frame for list ---------
         self.left_frame = tk.Frame(master, bg="#2a2a2a")
@@ -173,6 +2118,12 @@ class GHubEditorApp:
         self.right_frame = ttk.Frame(master, style="Dark.TFrame")
         self.right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
+        # Search box, filters the list as you type
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(self.left_frame, textvariable=self.search_var, style="Dark.TEntry")
+        self.search_entry.pack(side=tk.TOP, fill=tk.X, padx=2, pady=2)
+        self.search_var.trace_add("write", self.on_search_changed)
+
         # Listbox (with exportselection=0)
         self.profile_list_var = tk.StringVar()
         self.profile_listbox = tk.Listbox(
@@ -210,6 +2161,8 @@ class GHubEditorApp:
 
         del_button = ttk.Button(self.right_frame, text="Delete Entry", command=self.delete_entry)
         del_button.grid(row=row_idx, column=1, padx=5, pady=5, sticky="w")
+        # Everything that changes the DB; disabled in browse mode
+        self.mutation_widgets = [add_button, del_button]
 
         # Name
         row_idx += 1
@@ -238,29 +2191,68 @@ class GHubEditorApp:
         self.icon_path_entry = ttk.Entry(self.right_frame, textvariable=self.icon_path_var, width=50, style="Dark.TEntry")
         self.icon_path_entry.grid(row=row_idx, column=1, sticky="w", padx=5, pady=5)
 
-        ttk.Button(self.right_frame, text="Browse Icon", command=self.browse_icon).grid(
-            row=row_idx, column=2, sticky="w", padx=5, pady=5
-        )
+        browse_button = ttk.Button(self.right_frame, text="Browse Icon", command=self.browse_icon)
+        browse_button.grid(row=row_idx, column=2, sticky="w", padx=5, pady=5)
 
         # Clear icon
         row_idx += 1
         clear_button = ttk.Button(self.right_frame, text="Clear Icon", command=self.clear_icon)
         clear_button.grid(row=row_idx, column=1, sticky="w", padx=5, pady=5)
+        import_button = ttk.Button(self.right_frame, text="Import Icons...", command=self.import_icons)
+        import_button.grid(row=row_idx, column=2, sticky="w", padx=5, pady=5)
+        self.mutation_widgets += [browse_button, clear_button, import_button]
+
+        # Icon conversion progress (shown while Browse Icon converts in the background)
+        row_idx += 1
+        self.icon_progress_frame = ttk.Frame(self.right_frame, style="Dark.TFrame")
+        self.icon_progress_frame.grid(row=row_idx, column=1, sticky="w", padx=5, pady=5)
+        self.icon_progress = ttk.Progressbar(self.icon_progress_frame, mode="indeterminate", length=150)
+        self.icon_progress.pack(side=tk.LEFT)
+        ttk.Button(self.icon_progress_frame, text="Cancel", command=self.cancel_icon_work).pack(side=tk.LEFT, padx=5)
+        self.icon_progress_frame.grid_remove()
+        self.icon_status_var = tk.StringVar()
+        ttk.Label(self.right_frame, textvariable=self.icon_status_var, style="Dark.TLabel").grid(
+            row=row_idx, column=2, sticky="w", padx=5, pady=5
+        )
 
         # Icon preview
         row_idx += 1
         self.icon_label = ttk.Label(self.right_frame, text="(No icon loaded)", style="Dark.TLabel")
         self.icon_label.grid(row=row_idx, column=0, columnspan=3, padx=5, pady=5)
 
-        # Save changes
+        # Apply changes / Save all
         row_idx += 1
-        ttk.Button(self.right_frame, text="Save Changes", command=self.save_changes).grid(
-            row=row_idx, column=0, columnspan=3, pady=10
-        )
+        apply_button = ttk.Button(self.right_frame, text="Apply Changes", command=self.apply_changes)
+        apply_button.grid(row=row_idx, column=0, pady=10, sticky="w", padx=5)
+        save_button = ttk.Button(self.right_frame, text="Save All", command=self.save_all)
+        save_button.grid(row=row_idx, column=1, pady=10, sticky="w", padx=5)
+        self.mutation_widgets += [apply_button, save_button]
+        master.bind_all("<Control-s>", self.save_all)
 
         # Let second column expand
         self.right_frame.grid_columnconfigure(1, weight=1)
 
+        # Quick open (fuzzy find by name)
+        self.quick_open_window = None
+        master.bind_all("<Control-p>", self.open_quick_open)
+
+        # Undo / redo
+        master.bind_all("<Control-z>", self.undo)
+        master.bind_all("<Control-y>", self.redo)
+        master.bind_all("<Control-Z>", self.redo)  # Ctrl+Shift+Z
+
+        if self.read_only:
+            self.apply_read_only()
+
+    def apply_read_only(self):
+        """
+        Browse mode: buttons that write are disabled, fields can be selected and copied but not edited.
+        """
+        for widget in self.mutation_widgets:
+            widget.state(["disabled"])
+        for entry in (self.name_entry, self.app_path_entry, self.icon_path_entry):
+            entry.state(["readonly"])
+
     # -----------------------------
     # Dark Theme Setup
     # -----------------------------
@@ -282,8 +2274,116 @@ class GHubEditorApp:
     # Profile List
     # -----------------------------
     def populate_list(self):
-        names = [p["profile"].get("name", "(Unnamed)") for p in self.profiles]
-        self.profile_list_var.set(names)
+        """
+        Refills the listbox from the store (or the search result). The old rows are
+        deleted first: Tk keeps per-row colors and selection by index across a
+        listvariable change, which would leave them on other profiles.
+        """
+        self.profile_listbox.delete(0, tk.END)
+        if self.filtered is None:
+            self.profile_list_var.set(self.profiles.names())
+        else:
+            self.profile_list_var.set([item.profile.get("name", "(Unnamed)") for item in self.filtered])
+        if self.dirty.profiles:
+            shown = self.filtered if self.filtered is not None else self.profiles
+            for idx, item in enumerate(shown):
+                if self.dirty.is_dirty(item):
+                    self.paint_row(item, idx)
+
+    def item_at(self, idx):
+        """
+        The profile shown at listbox row idx.
+        """
+        return self.filtered[idx] if self.filtered is not None else self.profiles[idx]
+
+    def row_of(self, item):
+        """
+        The listbox row showing item, None if the active search hides it.
+        """
+        if self.filtered is None:
+            return self.profiles.index_of(item)
+        return next((idx for idx, other in enumerate(self.filtered) if other is item), None)
+
+    def show_filtered(self, keep=None):
+        """
+        Refills the listbox with self.filtered. If keep is still shown, it stays
+        selected (without reloading the detail fields); returns its row or None.
+        """
+        self.populate_list()
+        self.selected_profile_index = None
+        self.profile_listbox.selection_clear(0, tk.END)
+        idx = self.row_of(keep) if keep is not None else None
+        if idx is None:
+            return None
+        self.profile_listbox.selection_set(idx)
+        self.profile_listbox.see(idx)
+        self.selected_profile_index = idx
+        return idx
+
+    def refresh_filter(self, keep=None):
+        """
+        Re-runs the current search after profiles changed. Returns keep's row or None.
+        """
+        self.filtered = self.profiles.search(self.filter_query)
+        return self.show_filtered(keep)
+
+    def on_search_changed(self, *_args):
+        query = self.search_var.get()
+        keep = self.item_at(self.selected_profile_index) if self.selected_profile_index is not None else None
+        if not search_words(query):
+            if self.filtered is None:
+                return
+            self.filtered = None
+        elif self.filtered is not None and query.startswith(self.filter_query):
+            # Typing more can only narrow the current result
+            self.filtered = self.profiles.search(query, within=self.filtered)
+        else:
+            self.filtered = self.profiles.search(query)
+        self.filter_query = query
+        self.show_filtered(keep)
+
+    def clear_search(self):
+        if self.search_var.get():
+            self.search_var.set("")
+
+    def insert_profile(self, item):
+        """
+        Shows one profile just added to self.profiles at its sorted position in the listbox.
+        Returns its listbox row (None if the active search hides it).
+        """
+        idx = self.profiles.index_of(item)
+        if self.filtered is not None:
+            return self.refresh_filter(keep=item)
+        self.profile_listbox.insert(idx, item.profile.get("name", "(Unnamed)"))
+        self.paint_row(item, idx)
+        return idx
+
+    def move_profile(self, item, old_idx, new_idx):
+        """
+        Moves one listbox row after its profile changed position in self.profiles.
+        Returns its listbox row (None if the active search no longer matches it).
+        """
+        if self.filtered is not None:
+            return self.refresh_filter(keep=item)
+        self.profile_listbox.delete(old_idx)
+        self.profile_listbox.insert(new_idx, item.profile.get("name", "(Unnamed)"))
+        self.paint_row(item, new_idx)
+        return new_idx
+
+    def select_app_id(self, app_id):
+        """
+        Selects the profile with this applicationId, if it is shown.
+        """
+        found = self.profiles.find_by_app_id(app_id)
+        idx = self.row_of(found[0]) if found else None
+        if idx is not None:
+            self.select_profile(idx)
+
+    def select_profile(self, idx):
+        self.profile_listbox.selection_clear(0, tk.END)
+        self.profile_listbox.selection_set(idx)
+        self.profile_listbox.see(idx)
+        self.profile_listbox.event_generate("<<ListboxSelect>>")
 
     def on_profile_select(self, event):
         try:
@@ -293,8 +2393,8 @@ class GHubEditorApp:
             return
 
         self.selected_profile_index = idx
-        item = self.profiles[idx]
-        prof = item["profile"]
+        item = self.item_at(idx)
+        prof = item.profile
 
         self.name_entry_var.set(prof.get("name", ""))
         self.app_path_var.set(prof.get("applicationPath", ""))
@@ -302,46 +2402,155 @@ class GHubEditorApp:
 
         self.load_icon_preview()
 
+    # -----------------------------
+    # Quick Open
+    # -----------------------------
+    def open_quick_open(self, event=None):
+        """
+        Ctrl+P: small window listing the best fuzzy name matches as you type.
+        Enter (or double-click) selects the profile, Escape closes.
+        """
+        if self.quick_open_window is not None:
+            self.quick_open_entry.focus_set()
+            return "break"
+
+        window = tk.Toplevel(self.master, bg="#2a2a2a")
+        window.title("Go to Profile")
+        window.transient(self.master)
+        window.protocol("WM_DELETE_WINDOW", self.close_quick_open)
+        self.quick_open_window = window
+        self.quick_open_results = []
+
+        self.quick_open_var = tk.StringVar()
+        self.quick_open_entry = ttk.Entry(window, textvariable=self.quick_open_var, width=50, style="Dark.TEntry")
+        self.quick_open_entry.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        self.quick_open_listbox = tk.Listbox(
+            window,
+            width=50,
+            height=12,
+            exportselection=False,
+            bg="#2a2a2a",
+            fg="#ffffff",
+            selectbackground="#444444",
+            highlightthickness=0,
+            bd=0
+        )
+        self.quick_open_listbox.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=(0, 5))
+
+        self.quick_open_var.trace_add("write", self.on_quick_open_changed)
+        self.quick_open_entry.bind("<Return>", self.choose_quick_open)
+        self.quick_open_entry.bind("<Down>", lambda e: self.move_quick_open(1))
+        self.quick_open_entry.bind("<Up>", lambda e: self.move_quick_open(-1))
+        self.quick_open_listbox.bind("<Double-Button-1>", self.choose_quick_open)
+        window.bind("<Escape>", lambda e: self.close_quick_open())
+        self.quick_open_entry.focus_set()
+        return "break"
+
+    def close_quick_open(self):
+        if self.quick_open_window is not None:
+            self.quick_open_window.destroy()
+            self.quick_open_window = None
+
+    def on_quick_open_changed(self, *_args):
+        self.quick_open_results = self.profiles.fuzzy_search(self.quick_open_var.get())
+        self.quick_open_listbox.delete(0, tk.END)
+        for item in self.quick_open_results:
+            self.quick_open_listbox.insert(tk.END, item.profile.get("name", "(Unnamed)"))
+        if self.quick_open_results:
+            self.quick_open_listbox.selection_set(0)
+
+    def move_quick_open(self, step):
+        if not self.quick_open_results:
+            return "break"
+        current = self.quick_open_listbox.curselection()
+        idx = min(max((current[0] if current else -1) + step, 0), len(self.quick_open_results) - 1)
+        self.quick_open_listbox.selection_clear(0, tk.END)
+        self.quick_open_listbox.selection_set(idx)
+        self.quick_open_listbox.see(idx)
+        return "break"
+
+    def choose_quick_open(self, event=None):
+        current = self.quick_open_listbox.curselection()
+        if not current:
+            return "break"
+        item = self.quick_open_results[current[0]]
+        self.close_quick_open()
+
+        # The profile may be hidden by the search box; show everything then
+        idx = self.row_of(item)
+        if idx is None:
+            self.clear_search()
+            idx = self.row_of(item)
+        self.select_profile(idx)
+        return "break"
+
+    # -----------------------------
+    # Undo / Redo
+    # -----------------------------
+    def undo(self, event=None):
+        if not self.read_only:
+            self.show_change(self.history.undo(self.profiles))
+        return "break"
+
+    def redo(self, event=None):
+        if not self.read_only:
+            self.show_change(self.history.redo(self.profiles))
+        return "break"
+
+    def show_change(self, change):
+        """
+        After undo/redo: refreshes the list and selects the affected profile if it
+        is still there. Its row now differs from the DB until the next save.
+        """
+        if change is None:
+            return
+        items = change.items()
+        for item in items:
+            if item in self.profiles:
+                self.dirty.mark(item)
+            else:
+                self.dirty.forget(item)
+        self.update_title()
+
+        keep = next((item for item in items if item in self.profiles), None)
+        if self.filtered is not None:
+            self.filtered = self.profiles.search(self.filter_query)
+        idx = self.show_filtered(keep)
+        if idx is not None:
+            self.select_profile(idx)
+        else:
+            self.clear_fields()
+
     # -----------------------------
     # Add / Delete
     # -----------------------------
     def add_entry(self):
+        self.add_entries(1)
+
+    def add_entries(self, count):
+        """
+        Adds count new blank profiles to the first profile row and selects the first one.
+        """
         if not self.profiles:
             messagebox.showinfo("No DB Rows", "No existing rows found in DB to attach a new entry.")
             return
-
-        row_id = self.profiles[0]["db_row_id"]
-        entire_json = self.profiles[0]["entire_json"]
-        apps_section = entire_json.get("applications", {})
-        apps_list = apps_section.get("applications", [])
-
-        new_profile = {
-            "applicationId": "new-app-id",
-            "applicationPath": "",
-            "isCustom": True,
-            "name": "New Entry",
-            "posterPath": ""
-        }
-        apps_list.append(new_profile)
-        apps_section["applications"] = apps_list
-        entire_json["applications"] = apps_section
-
-        save_profile_to_db(self.db_path, row_id, entire_json)
-
-        # Reload
-        self.profiles = load_profiles_from_db(self.db_path)
-        self.populate_list()
-
-        # Auto-select
-        idx = None
-        for i, p in enumerate(self.profiles):
-            if p["profile"].get("name") == "New Entry":
-                idx = i
-                break
-        if idx is not None:
-            self.profile_listbox.selection_clear(0, tk.END)
-            self.profile_listbox.selection_set(idx)
-            self.profile_listbox.event_generate("<<ListboxSelect>>")
+        row = self.profiles[0].row
+        if not self.ensure_document(row):
+            return
+        # Show the whole list so the new entries are visible
+        self.clear_search()
+
+        records = add_new_profiles(self.profiles, row, count)
+        for record in records:
+            self.dirty.mark(record)
+        if count == 1:
+            # Add just the new entry to the list
+            self.insert_profile(records[0])
+        else:
+            self.populate_list()
+        self.history.record(EntriesChange.inserted(records))
+        self.update_title()
+        self.select_app_id(records[0].profile["applicationId"])
 
     def delete_entry(self):
         if self.selected_profile_index is None:
@@ -352,24 +2561,24 @@ class GHubEditorApp:
         if not confirm:
             return
 
-        item = self.profiles[self.selected_profile_index]
-        row_id = item["db_row_id"]
-        entire_json = item["entire_json"]
-        prof_to_delete = item["profile"]
-
-        apps_list = entire_json.get("applications", {}).get("applications", [])
-        if prof_to_delete in apps_list:
-            apps_list.remove(prof_to_delete)
-        entire_json["applications"]["applications"] = apps_list
-
-        save_profile_to_db(self.db_path, row_id, entire_json)
-
-        # Reload
-        self.profiles = load_profiles_from_db(self.db_path)
+        item = self.item_at(self.selected_profile_index)
+        if not self.ensure_document(item.row):
+            return
+        change = EntriesChange.deleted([item])
+        change.apply(self.profiles)
+        self.history.record(change)
+        self.dirty.forget(item)
+        self.update_title()
+
+        # Drop just the deleted entry from the list
+        if self.filtered is not None:
+            del self.filtered[self.selected_profile_index]
+        self.profile_listbox.delete(self.selected_profile_index)
         self.selected_profile_index = None
-        self.populate_list()
 
-        # Clear fields
+        self.clear_fields()
+
+    def clear_fields(self):
         self.name_entry_var.set("")
         self.app_path_var.set("")
         self.icon_path_var.set("")
@@ -392,46 +2601,217 @@ class GHubEditorApp:
         )
         if not file_path:
             return
-
-        try:
-            img = Image.open(file_path)
-        except Exception as e:
-            logging.error(f"Failed to open image {file_path}: {e}")
-            messagebox.showerror("Error", f"Could not open image file:\n{e}")
+        if not self.ensure_document(self.item_at(self.selected_profile_index).row):
             return
 
-        item = self.profiles[self.selected_profile_index]
-        prof = item["profile"]
-        existing_path = prof.get("posterPath", "").strip()
-        app_name = prof.get("name", "").strip() or "app_unknown"
-        safe_name = re.sub(r'[^\w\s-]', '', app_name).strip().replace(' ', '_') or "icon"
-
         # If there's an existing file, overwrite its base. Otherwise, create new
-        if existing_path:
-            base, _ext = os.path.splitext(existing_path)
-            final_path = base + ".bmp"
-        else:
-            final_path = os.path.join(self.icon_cache_folder, safe_name + ".bmp")
+        item = self.item_at(self.selected_profile_index)
+        final_path = icon_target_path(item.profile, self.icon_cache_folder)
+
+        # Convert to BMP in the background; poll_icon_job picks up the result
+        self.cancel_icon_work()
+        future = self.icon_executor.submit(convert_icon_to_bmp, file_path, self.icon_store.folder)
+        self.icon_job = IconJob(future, item, final_path)
+        self.icon_status_var.set(f"Converting {os.path.basename(file_path)}...")
+        self.icon_progress_frame.grid()
+        self.icon_progress.config(mode="indeterminate")
+        self.icon_progress.start(10)
+        self.master.after(ICON_POLL_MS, self.poll_icon_job)
+
+    def poll_icon_job(self):
+        job = self.icon_job
+        if job is None:
+            return
+        if not job.future.done():
+            self.master.after(ICON_POLL_MS, self.poll_icon_job)
+            return
+        self.icon_job = None
+        self.hide_icon_progress()
 
-        # Convert to BMP
         try:
-            img.save(final_path, "BMP")
+            converted = job.future.result()
         except Exception as e:
-            logging.error(f"Failed to save BMP to {final_path}: {e}")
-            messagebox.showerror("Error", f"Could not save BMP:\n{e}")
+            logging.error(f"Failed to convert icon to {job.final_path}: {e}")
+            self.icon_status_var.set(f"Icon conversion failed: {e}")
+            return
+        if job.item not in self.profiles:
+            # Deleted while converting
+            discard_converted_icon(job.future)
+            self.icon_status_var.set("")
+            return
+        try:
+            file_edit, shared = self.store_icon(converted, job.final_path, [job.item])
+        except OSError as e:
+            logging.error(f"Failed to save BMP to {job.final_path}: {e}")
+            self.icon_status_var.set(f"Could not save BMP: {e}")
+            discard_converted_icon(job.future)
             return
 
-        prof["posterPath"] = final_path
-        self.icon_path_var.set(final_path)
-        self.load_icon_preview()
+        self.icon_status_var.set("Same image as another icon, stored once." if shared else "")
+        self.set_poster_path(job.item, job.final_path, file_edit)
+
+    def store_icon(self, converted, path, records):
+        """
+        Writes a converted icon to path through the icon store, keeping the image
+        it replaces for undo. Returns (the IconFileEdit, or None if path already
+        held this image; whether the image was shared).
+        """
+        before = self.icon_store.keep(path)
+        shared = self.icon_store.put(converted, path)
+        after = self.icon_store.keep(path)
+        file_edit = IconFileEdit(records, self.icon_store, path, before, after) if before != after else None
+        return file_edit, shared
+
+    def cancel_icon_job(self):
+        job = self.icon_job
+        if job is None:
+            return
+        self.icon_job = None
+        if not job.future.cancel():
+            # Already running: let it finish, then throw the result away
+            job.future.add_done_callback(discard_converted_icon)
+        self.hide_icon_progress()
+        self.icon_status_var.set("Icon conversion cancelled.")
+
+    def import_icons(self):
+        """
+        Bulk import: every image in a chosen folder whose file name matches a
+        profile name (see match_icon_files) is converted to BMP in a process pool
+        and set as that profile's icon. The changes are one undo step and are
+        written together by Save All.
+        """
+        folder = filedialog.askdirectory(title="Select a folder of icon images")
+        if not folder:
+            return
+        try:
+            jobs = match_icon_files(folder, self.profiles, self.icon_cache_folder)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not read folder:\n{e}")
+            return
+        if not jobs:
+            messagebox.showinfo("Import Icons", "No image in that folder matches a profile name.")
+            return
+        rows = {id(record.row): record.row for _src, records in jobs.values() for record in records}
+        for row in rows.values():
+            if not self.ensure_document(row):
+                return
+
+        self.cancel_icon_work()
+        executor = concurrent.futures.ProcessPoolExecutor()
+        futures = {
+            executor.submit(convert_icon_to_bmp, src_path, self.icon_store.folder): (target, records)
+            for target, (src_path, records) in jobs.items()
+        }
+        self.icon_import = IconImport(executor, futures)
+        self.icon_status_var.set(f"Converting {len(futures)} icon(s)...")
+        self.icon_progress_frame.grid()
+        self.icon_progress.config(mode="determinate", maximum=len(futures), value=0)
+        self.master.after(ICON_POLL_MS, self.poll_icon_import)
+
+    def poll_icon_import(self):
+        icon_import = self.icon_import
+        if icon_import is None:
+            return
+        done = sum(future.done() for future in icon_import.futures)
+        self.icon_progress.config(value=done)
+        if done < len(icon_import.futures):
+            self.master.after(ICON_POLL_MS, self.poll_icon_import)
+            return
+        self.icon_import = None
+        icon_import.executor.shutdown(wait=False)
+        self.hide_icon_progress()
+
+        edits = []
+        imported = {}  # id(record) -> profile whose icon file was written
+        failed = 0
+        saved_before = self.icon_store.bytes_saved
+        for future, (target, records) in icon_import.futures.items():
+            try:
+                file_edit, _shared = self.store_icon(future.result(), target, records)
+            except Exception as e:
+                logging.warning(f"Failed to import icon {target}: {e}")
+                discard_converted_icon(future)
+                failed += 1
+                continue
+            if file_edit is not None:
+                edits.append(file_edit)
+            for record in records:
+                if record not in self.profiles:
+                    continue
+                imported[id(record)] = record
+                edit = FieldEdit.between(record, {"posterPath": target})
+                if edit is not None:
+                    edits.append(edit)
+                    record.profile["posterPath"] = target
+                    self.dirty.mark(record)
+
+        if edits:
+            self.history.record(EditGroup(edits))
+            self.populate_list()
+            self.update_title()
+            if self.selected_profile_index is not None:
+                self.profile_listbox.selection_set(self.selected_profile_index)
+        # Also when only the file changed (posterPath already named the BMP)
+        if self.selected_profile_index is not None:
+            selected = self.item_at(self.selected_profile_index)
+            if id(selected) in imported:
+                self.icon_path_var.set(selected.profile.get("posterPath", ""))
+                self.load_icon_preview()
+        saved = self.icon_store.bytes_saved - saved_before
+        logging.info(f"Icon import: {len(imported)} profile(s) updated, {failed} conversion(s) failed, "
+                     f"{format_size(saved)} saved by sharing identical images.")
+        status = f"Imported icons for {len(imported)} profile(s)"
+        if failed:
+            status += f", {failed} failed"
+        if saved:
+            status += f", {format_size(saved)} saved by sharing identical images"
+        self.icon_status_var.set(status + ".")
+
+    def cancel_icon_import(self):
+        icon_import = self.icon_import
+        if icon_import is None:
+            return
+        self.icon_import = None
+        for future in icon_import.futures:
+            if not future.cancel():
+                future.add_done_callback(discard_converted_icon)
+        icon_import.executor.shutdown(wait=False, cancel_futures=True)
+        self.hide_icon_progress()
+        self.icon_status_var.set("Icon import cancelled.")
+
+    def cancel_icon_work(self):
+        self.cancel_icon_job()
+        self.cancel_icon_import()
+
+    def hide_icon_progress(self):
+        self.icon_progress.stop()
+        self.icon_progress_frame.grid_remove()
+
+    def set_poster_path(self, item, path, file_edit=None):
+        """
+        Points a profile at a new icon file (an undoable, unsaved edit). file_edit,
+        the IconFileEdit that wrote the file, is undone in the same step.
+        """
+        edits = [edit for edit in (file_edit, FieldEdit.between(item, {"posterPath": path})) if edit is not None]
+        if edits:
+            self.history.record(edits[0] if len(edits) == 1 else EditGroup(edits))
+        item.profile["posterPath"] = path
+        self.mark_dirty(item)
+        if self.selected_profile_index is not None and self.item_at(self.selected_profile_index) is item:
+            self.icon_path_var.set(path)
+            self.load_icon_preview()
 
     def clear_icon(self):
         if self.selected_profile_index is None:
             messagebox.showwarning("No Profile", "Select a profile first.")
             return
-        item = self.profiles[self.selected_profile_index]
-        prof = item["profile"]
+        item = self.item_at(self.selected_profile_index)
+        if not self.ensure_document(item.row):
+            return
+        prof = item.profile
+        self.history.record(FieldEdit.between(item, {"posterPath": ""}))
         prof["posterPath"] = ""
+        self.mark_dirty(item)
         self.icon_path_var.set("")
         self.icon_label.config(text="(No icon loaded)", image="", compound=tk.NONE)
         logging.info("Icon cleared. posterPath is now empty.")
@@ -446,55 +2826,152 @@ class GHubEditorApp:
             return
 
         try:
-            img = Image.open(path)
-            self.icon_tk = ImageTk.PhotoImage(img)
+            self.icon_tk = self.icon_previews.get(path)
             self.icon_label.config(image=self.icon_tk, text="", compound=tk.NONE)
         except Exception as e:
             logging.warning(f"Failed to load image '{path}': {e}")
             self.icon_label.config(text="(Invalid image)", image="", compound=tk.NONE)
 
+    def decode_icon_preview(self, path):
+        return ImageTk.PhotoImage(open_preview_image(path))
+
     # -----------------------------
-    # Save
+    # Apply / Save
     # -----------------------------
-    def save_changes(self):
+    def apply_changes(self):
+        """
+        Applies the edited fields to the selected profile, in memory. Save All writes them.
+        """
         if self.selected_profile_index is None:
             messagebox.showwarning("No Profile", "Select a profile first.")
             return
 
-        item = self.profiles[self.selected_profile_index]
-        row_id = item["db_row_id"]
-        entire_json = item["entire_json"]
-        prof = item["profile"]
-
-        prof["name"] = self.name_entry_var.get()
-        prof["applicationPath"] = self.app_path_var.get()
-        prof["posterPath"] = self.icon_path_var.get()
-
-        save_profile_to_db(self.db_path, row_id, entire_json)
-
-        # Reload
-        self.profiles = load_profiles_from_db(self.db_path)
-        self.populate_list()
+        item = self.item_at(self.selected_profile_index)
+        if not self.ensure_document(item.row):
+            return
+        changes = self.field_values()
+        edit = FieldEdit.between(item, changes)
+        if edit is None:
+            return
+        self.history.record(edit)
+        old_idx, new_idx = self.profiles.update(item, changes)
+        self.dirty.mark(item)
+        self.update_title()
+
+        # Move just this entry to its (possibly new) sorted position and keep it selected
+        shown_idx = self.move_profile(item, old_idx, new_idx)
+        if shown_idx is not None:
+            self.select_profile(shown_idx)
+        logging.info(f"Changes applied to profile '{item.profile['name']}' (row ID={item.row.row_id}), not saved yet.")
+
+    def field_values(self):
+        """
+        The name, path and icon fields as profile fields.
+        """
+        return {
+            "name": self.name_entry_var.get(),
+            "applicationPath": self.app_path_var.get(),
+            "posterPath": self.icon_path_var.get()
+        }
 
-        # Keep selection if possible
-        new_name = prof["name"]
-        idx = None
-        for i, p in enumerate(self.profiles):
-            if p["profile"].get("name") == new_name:
-                idx = i
-                break
-        if idx is not None:
-            self.profile_listbox.selection_clear(0, tk.END)
-            self.profile_listbox.selection_set(idx)
-            self.profile_listbox.event_generate("<<ListboxSelect>>")
+    def has_pending_fields(self):
+        """
+        True if the fields were edited but not applied to the selected profile yet.
+        """
+        if self.read_only or self.selected_profile_index is None:
+            return False
+        prof = self.item_at(self.selected_profile_index).profile
+        return any(prof.get(key, "") != value for key, value in self.field_values().items())
+
+    def save_all(self, event=None):
+        """
+        Applies any pending field edits of the selected profile, then writes every
+        row with unsaved edits in one transaction. Rows nobody touched are not
+        serialized or written.
+        """
+        if self.has_pending_fields():
+            self.apply_changes()
+        if self.read_only or not self.dirty:
+            return "break"
+        rows = list(self.dirty.rows.values())
+        if not save_rows_to_db(self.db_path, [(row.row_id, row.document) for row in rows]):
+            messagebox.showerror("Error", "Could not save changes, nothing was written.\nSee the log for details.")
+            return "break"
+
+        for item in self.dirty.clear():
+            if item in self.profiles:
+                self.paint_row(item)
+        self.update_title()
+        logging.info(f"Saved {len(rows)} changed row(s) to the DB.")
+        return "break"
+
+    def ensure_document(self, row):
+        """
+        Parses a row that was only loaded names-first, before it gets edited.
+        Returns False (after telling the user) if that failed.
+        """
+        if load_row_document(self.db_path, self.profiles, row) is not None:
+            return True
+        messagebox.showerror(
+            "Error",
+            "This profile changed in settings.db since the editor loaded it.\nRestart the editor to reload it."
+        )
+        return False
 
-        logging.info(f"Changes saved for profile '{new_name}' (row ID={row_id}).")
-        messagebox.showinfo("Saved", f"Profile '{new_name}' updated.")
+    # -----------------------------
+    # Dirty Tracking
+    # -----------------------------
+    def mark_dirty(self, item):
+        self.dirty.mark(item)
+        self.paint_row(item)
+        self.update_title()
+
+    def paint_row(self, item, idx=None):
+        """
+        Colors item's list row by whether it has unsaved edits.
+        """
+        if idx is None:
+            idx = self.row_of(item)
+            if idx is None:
+                return
+        color = self.DIRTY_FG if self.dirty.is_dirty(item) else self.LIST_FG
+        self.profile_listbox.itemconfig(idx, fg=color)
+
+    def update_title(self):
+        self.master.title(f"* {self.base_title}" if self.dirty else self.base_title)
+
+    def on_close(self):
+        if self.dirty or self.has_pending_fields():
+            answer = messagebox.askyesnocancel("Unsaved Changes", "Save changes before closing?")
+            if answer is None:
+                return
+            if answer:
+                self.save_all()
+                if self.dirty or self.has_pending_fields():
+                    return
+        self.cancel_icon_work()
+        self.icon_executor.shutdown(wait=False, cancel_futures=True)
+        self.icon_store.release_kept()
+        self.master.destroy()
 
 # ---------------------------------------
 # Main
 # ---------------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Logitech G-Hub Profile Editor")
+    parser.add_argument(
+        "--browse", action="store_true",
+        help="open settings.db read-only, without locks (safe while G HUB is running)"
+    )
+    parser.add_argument(
+        "--dedupe-icons", action="store_true",
+        help="store identical icons in icon_cache only once, report the space saved and exit"
+    )
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
+
     # 1) Define paths
     hub_path = get_hub_path()
     db_path = get_db_path()
@@ -503,13 +2980,27 @@ def main():
     # 2) Setup Logging
     setup_logging(hub_path)
 
+    if args.dedupe_icons:
+        checked, saved = IconStore(icon_cache_folder).dedupe_folder(icon_cache_folder)
+        report = f"Checked {checked} icon(s) in {icon_cache_folder}, {format_size(saved)} saved."
+        logging.info(report)
+        print(report)
+        return
+
     # 3) Verify DB Path
     if not os.path.isfile(db_path):
         logging.error(f"DB file not found at {db_path}")
         messagebox.showerror("Error", f"DB file not found at:\n{db_path}")
         return
 
-    # 4) Launch GUI
+    # 4) Load profiles, from the warm-start snapshot if settings.db is unchanged
+    if args.browse:
+        get_db(db_path, read_only=True)
+        logging.info("Browse mode: settings.db is opened read-only.")
+    snapshot_path = get_snapshot_path(hub_path)
+    profiles = load_profiles_from_snapshot(snapshot_path, db_path)
+
+    # 5) Launch GUI
     root = tk.Tk()
 
     # Configure dark theme for Windows titlebar
@@ -532,9 +3023,17 @@ def main():
     except Exception as e:
         logging.warning(f"Failed to set dark mode for window: {e}")  # Changed to log exception
 
-    # 5) Create app instance
-    app = GHubEditorApp(root, db_path, icon_cache_folder)
+    # 6) Create app instance
+    app = GHubEditorApp(root, db_path, icon_cache_folder, profiles, read_only=args.browse)
     root.mainloop()
+    logging.debug(f"Icon preview cache: {app.icon_previews.stats()}")
+
+    # 7) Rewrite the snapshot, unless it would capture edits that were never saved
+    if not app.dirty:
+        refresh_snapshot(snapshot_path, db_path)
+    close_all_dbs()
 
 if __name__ == "__main__":
+    # The icon import's process pool re-runs this file in its workers when frozen into an .exe
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -------------------------------------------------------------
+# Logitech G-Hub Profile Editor - Benchmarks
+# -------------------------------------------------------------
+# Times the editor's DB / JSON helpers against synthetic settings.db files
+# created in a temp folder. The real settings.db is never touched.
+#
+# Usage: python LGHUB_Profile_Editor_bench.py [benchmark ...]
+#        (no arguments runs all of them)
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import sqlite3
+import tempfile
+import tracemalloc
+
+import LGHUB_Profile_Editor_V3 as editor
+
+# ---------------------------------------
+# Synthetic Data
+# ---------------------------------------
+def make_settings_doc(profile_count, filler_entries=20000, seed=1):
+    """
+    Builds a settings.db-like document: an "applications" section with
+    profile_count custom profiles plus device/lighting filler that never changes.
+    """
+    rnd = random.Random(seed)
+    words = ["Call", "of", "Duty", "Modern", "Warfare", "Half", "Life", "Elden", "Ring",
+             "Counter", "Strike", "Rocket", "League", "Star", "Citizen", "Forza", "Horizon"]
+    applications = []
+    for i in range(profile_count):
+        name = " ".join(rnd.choice(words) for _ in range(rnd.randint(1, 4))) + f" {i}"
+        applications.append({
+            "applicationId": f"{rnd.getrandbits(128):032x}",
+            "applicationPath": f"C:\\Games\\{name.replace(' ', '')}\\game.exe",
+            "isCustom": True,
+            "name": name,
+            "posterPath": ""
+        })
+    filler = {
+        f"device/{i}": {"brightness": rnd.random(), "colors": [rnd.randint(0, 255) for _ in range(8)]}
+        for i in range(filler_entries)
+    }
+    return {"applications": {"applications": applications}, "lighting": filler}
+
+def make_settings_db(path, doc, **dumps_kwargs):
+    """
+    Writes a one-row DATA table holding doc, serialized with json.dumps(**dumps_kwargs).
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE {editor.TABLE_NAME} ({editor.ID_COLUMN} INTEGER PRIMARY KEY, {editor.JSON_COLUMN} BLOB)")
+    conn.execute(
+        f"INSERT INTO {editor.TABLE_NAME} VALUES (1, ?)",
+        (json.dumps(doc, **dumps_kwargs).encode("utf-8"),)
+    )
+    conn.commit()
+    conn.close()
+
+def best_of(fn, repeat=5):
+    """
+    Runs fn repeat times and returns the fastest wall time in seconds.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+# ---------------------------------------
+# Benchmarks
+# ---------------------------------------
+def bench_serializer(tmp_dir):
+    """
+    Blob size, full-document encode time and save time when a row is written back
+    compact (as G HUB stores it) versus with the indent=2 layout older versions of
+    the editor produced. Saves of a single rename go through the byte-splice path.
+    """
+    doc = make_settings_doc(2000)
+    layouts = [
+        ("compact", {"separators": (",", ":"), "ensure_ascii": False}),
+        ("indent=2", {"indent": 2}),
+    ]
+    print(f"{'layout':<10} {'blob size':>12} {'encode (ms)':>12} {'save (ms)':>10}")
+    for label, dumps_kwargs in layouts:
+        db_path = os.path.join(tmp_dir, f"serializer_{label}.db")
+        make_settings_db(db_path, doc, **dumps_kwargs)
+        profiles = editor.load_profiles_from_db(db_path)
+        item = profiles[0]
+        counter = [0]
+
+        def save():
+            # Change something every time, unchanged documents are not written
+            counter[0] += 1
+            item.profile["name"] = f"Renamed {counter[0]}"
+            editor.save_profile_to_db(db_path, item.row.row_id, item.row.document)
+
+        save_time = best_of(save)
+        cached = editor.get_db(db_path).parse_cache[item.row.row_id]
+        encode_time = best_of(lambda: editor.encode_json(item.row.document, cached.fmt))
+        blob_size = len(editor.get_db(db_path).read_row(item.row.row_id))
+        print(f"{label:<10} {blob_size:>12,} {encode_time * 1000:>12.1f} {save_time * 1000:>10.1f}")
+    editor.close_all_dbs()
+
+def bench_codecs(tmp_dir):
+    """
+    Parse and serialize times of each available JSON backend on a synthetic
+    settings.db document. Each layout is detected from a stored blob the way a
+    save would see it: G HUB's compact UTF-8, the indent=2 layout older versions
+    of the editor wrote (ASCII, so written unescaped), and indent=2 with a
+    non-ASCII name stored as \\u escapes, which orjson hands to the stdlib codec.
+    "same bytes" compares the output with the stored blob (floats in exponent
+    range are spelled differently by orjson); "same values" checks that what it
+    parses and writes decodes to the original document.
+    """
+    doc = make_settings_doc(2000)
+    escaped_doc = make_settings_doc(2000)
+    escaped_doc["applications"]["applications"][0]["name"] = "Pok\u00e9mon"
+    stored = [
+        ("compact", doc, json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")),
+        ("indent=2", doc, json.dumps(doc, indent=2).encode("utf-8")),
+        ("escaped", escaped_doc, json.dumps(escaped_doc, indent=2).encode("utf-8")),
+    ]
+    layouts = [(label, obj, blob, editor.detect_json_format(blob)) for label, obj, blob in stored]
+    blob = layouts[0][2]
+    print(f"document: {len(blob):,} bytes")
+    print(f"{'codec':<8} {'loads (ms)':>11} " + " ".join(f"{'dumps ' + label:>15}" for label, *_ in layouts)
+          + f" {'same bytes':>11} {'same values':>12}")
+
+    names = ["json"] + (["orjson"] if editor.orjson is not None else [])
+    reference = editor.get_json_codec("json")
+    for name in names:
+        codec = editor.get_json_codec(name)
+        loads_time = best_of(lambda: codec.loads(blob))
+        dumps_times = [best_of(lambda: codec.dumps(obj, fmt)) for _label, obj, _blob, fmt in layouts]
+        same_bytes = all(codec.dumps(obj, fmt) == stored_blob for _label, obj, stored_blob, fmt in layouts)
+        same_values = codec.loads(blob) == doc and all(
+            reference.loads(codec.dumps(obj, fmt)) == obj for _label, obj, _blob, fmt in layouts
+        )
+        print(f"{name:<8} {loads_time * 1000:>11.1f} "
+              + " ".join(f"{t * 1000:>15.1f}" for t in dumps_times)
+              + f" {'yes' if same_bytes else 'no':>11} {'yes' if same_values else 'NO':>12}")
+    if editor.orjson is None:
+        print("(orjson is not installed, only the stdlib codec was measured)")
+
+def bench_records(tmp_dir):
+    """
+    Memory per profile and build + sort time of the slotted ProfileRecord wrappers
+    versus the { db_row_id, entire_json, profile } dicts the loader used to build.
+    """
+    profile_count = 50000
+    doc = make_settings_doc(profile_count, filler_entries=0)
+    apps_list = doc["applications"]["applications"]
+
+    def build_dicts():
+        items = [{"db_row_id": 1, "entire_json": doc, "profile": prof} for prof in apps_list]
+        items.sort(key=lambda p: p["profile"].get("name", "").lower())
+        return items
+
+    def build_records():
+        return sorted(editor.iter_row_profiles(1, doc), key=editor.profile_sort_key)
+
+    print(f"{profile_count:,} profiles")
+    print(f"{'wrapper':<14} {'bytes/profile':>14} {'build+sort (ms)':>16}")
+    for label, build in [("dict", build_dicts), ("ProfileRecord", build_records)]:
+        tracemalloc.start()
+        items = build()
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del items
+        elapsed = best_of(build)
+        print(f"{label:<14} {size / profile_count:>14.1f} {elapsed * 1000:>16.1f}")
+
+def bench_fuzzy(tmp_dir):
+    """
+    Quick-open (Ctrl+P) search over 10,000 profiles: trigram index build time and
+    per-keystroke lookup time while typing a few queries character by character.
+    Every keystroke should stay under 10 ms. Also checks that an abbreviation ranks
+    the profile it abbreviates first ("cod mw" -> "Call of Duty: Modern Warfare",
+    ahead of "Counter Modern").
+    """
+    profile_count = 10000
+    doc = make_settings_doc(profile_count, filler_entries=0)
+    expected = {"cod mw": "Call of Duty: Modern Warfare"}
+    for name in ["Call of Duty: Modern Warfare", "Counter Modern", "Minecraft", "Star Citizen"]:
+        doc["applications"]["applications"].append({"name": name, "applicationPath": "", "posterPath": ""})
+    records = sorted(editor.iter_row_profiles(1, doc), key=editor.profile_sort_key)
+
+    def build():
+        index = editor.TrigramIndex()
+        for item in records:
+            index.add(item)
+        return index
+
+    index = build()
+    print(f"{profile_count:,} profiles, index build {best_of(build, repeat=3) * 1000:.1f} ms")
+    print(f"{'query':<20} {'mean (ms)':>10} {'worst (ms)':>11} {'top match':<30}")
+    failed = []
+    for query in ["cod mw", "mw", "call of duty", "star citzen", "rocket leag 42", "forza horizon 1234"]:
+        times = [best_of(lambda: index.search(query[:n])) for n in range(1, len(query) + 1)]
+        top = index.search(query)
+        top_name = top[0].profile["name"] if top else "-"
+        if query in expected and top_name != expected[query]:
+            failed.append(query)
+        print(f"{query:<20} {sum(times) / len(times) * 1000:>10.2f} {max(times) * 1000:>11.2f} {top_name:<30}")
+    if failed:
+        print(f"WRONG TOP MATCH for: {', '.join(failed)}")
+
+def bench_lazy(tmp_dir):
+    """
+    Time until the profile list can be shown: the full load (every row's whole
+    document parsed) versus the names-first load (only the profile lists, pulled
+    out by SQLite), for 2,000 profiles in documents of growing size.
+    """
+    print(f"{'filler entries':>14} {'blob size':>12} {'full (ms)':>10} {'names-first (ms)':>17}")
+    for filler_entries in (0, 20000, 100000):
+        db_path = os.path.join(tmp_dir, f"lazy_{filler_entries}.db")
+        make_settings_db(db_path, make_settings_doc(2000, filler_entries), separators=(",", ":"), ensure_ascii=False)
+        blob_size = os.path.getsize(db_path)
+
+        def load(loader):
+            # Fresh handle each time so the parse cache doesn't help
+            editor.close_all_dbs()
+            loader(db_path)
+
+        full_time = best_of(lambda: load(editor.load_profiles_from_db), repeat=3)
+        lazy_time = best_of(lambda: load(editor.load_profile_list_from_db), repeat=3)
+        print(f"{filler_entries:>14,} {blob_size:>12,} {full_time * 1000:>10.1f} {lazy_time * 1000:>17.1f}")
+    editor.close_all_dbs()
+
+BENCHMARKS = {
+    "serializer": bench_serializer,
+    "codecs": bench_codecs,
+    "records": bench_records,
+    "fuzzy": bench_fuzzy,
+    "lazy": bench_lazy,
+}
+
+# ---------------------------------------
+# Main
+# ---------------------------------------
+def main():
+    logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+    names = sys.argv[1:] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}. Available: {', '.join(BENCHMARKS)}")
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name in names:
+            print(f"\n== {name} ==")
+            BENCHMARKS[name](tmp_dir)
+
+if __name__ == "__main__":
+    main()